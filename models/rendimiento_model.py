@@ -6,7 +6,6 @@ el rendimiento de cultivos.
 """
 
 import numpy as np
-import pandas as pd
 from typing import Dict, Tuple
 import json
 
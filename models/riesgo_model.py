@@ -9,6 +9,110 @@ import pandas as pd
 from typing import Dict, List, Tuple
 import json
 
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError:  # Numba es opcional
+    _NUMBA_AVAILABLE = False
+
+
+# Meses de mayor riesgo climático por región (simplificado)
+_MESES_RIESGO_ALTO = {
+    'Lima': frozenset({6, 7, 8, 9}),  # Invierno
+    'Arequipa': frozenset({6, 7, 8}),
+    'Junín': frozenset({1, 2, 3, 12}),  # Temporada de lluvias
+    'Cusco': frozenset({1, 2, 3, 12}),
+    'Piura': frozenset({1, 2, 3, 4})  # Lluvias/Niño
+}
+
+# Incremento del 15% del riesgo climático en meses críticos
+_FACTOR_MES_CRITICO = 1.15
+
+
+def _riesgo_climatico_py(sequia: float, heladas: float, lluvias: float,
+                         temperatura: float, factor_estacional: float) -> Tuple[float, float]:
+    """
+    Riesgo de plagas y riesgo climático agregado, sin redondear.
+    
+    Args:
+        sequia: Riesgo de sequía
+        heladas: Riesgo de heladas
+        lluvias: Riesgo de lluvias intensas
+        temperatura: Temperatura promedio de la región
+        factor_estacional: Ajuste por mes de siembra (1.0 si no aplica)
+        
+    Returns:
+        Tupla (riesgo_plagas, riesgo_total)
+    """
+    riesgo_plagas = max(0.15, min(0.25 + (temperatura - 15) * 0.01, 0.45))
+    riesgo_total = (
+        sequia * 0.35 +
+        heladas * 0.25 +
+        lluvias * 0.25 +
+        riesgo_plagas * 0.15
+    ) * factor_estacional
+    return riesgo_plagas, riesgo_total
+
+
+def _ira_py(riesgo_clim: float, riesgo_merc: float, riesgo_prod: float,
+            peso_clim: float, peso_merc: float, peso_prod: float) -> float:
+    """IRA ponderado a partir de los riesgos ya redondeados de cada componente"""
+    return riesgo_clim * peso_clim + riesgo_merc * peso_merc + riesgo_prod * peso_prod
+
+
+# Versiones compiladas con Numba; sin fastmath para no alterar los redondeos
+# ni las fronteras entre categorías
+if _NUMBA_AVAILABLE:
+    _riesgo_climatico_kernel = njit(cache=True)(_riesgo_climatico_py)
+    _ira_kernel = njit(cache=True)(_ira_py)
+    # Compilar al importar para que el primer cálculo ya sea nativo
+    _riesgo_climatico_kernel(0.0, 0.0, 0.0, 0.0, 1.0)
+    _ira_kernel(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+else:
+    _riesgo_climatico_kernel = _riesgo_climatico_py
+    _ira_kernel = _ira_py
+
+
+if _NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _riesgo_climatico_lote(sequia, heladas, lluvias, temperatura,
+                               factor_estacional, riesgo_total):
+        """Llena riesgo_total región por región"""
+        for i in range(riesgo_total.shape[0]):
+            riesgo_total[i] = _riesgo_climatico_kernel(
+                sequia[i], heladas[i], lluvias[i], temperatura[i], factor_estacional[i]
+            )[1]
+
+    _calentamiento = np.zeros(1)
+    _riesgo_climatico_lote(*[_calentamiento] * 6)
+    del _calentamiento
+
+
+def _riesgo_climatico_regiones(sequia: np.ndarray, heladas: np.ndarray,
+                               lluvias: np.ndarray, temperatura: np.ndarray,
+                               factor_estacional: np.ndarray) -> np.ndarray:
+    """
+    Riesgo climático agregado (sin redondear) de un lote de regiones.
+    
+    Args:
+        sequia: Riesgo de sequía por región
+        heladas: Riesgo de heladas por región
+        lluvias: Riesgo de lluvias intensas por región
+        temperatura: Temperatura promedio por región
+        factor_estacional: Ajuste por mes de siembra por región
+        
+    Returns:
+        Array con el riesgo climático de cada región
+    """
+    if not _NUMBA_AVAILABLE:
+        plagas = np.clip(0.25 + (temperatura - 15) * 0.01, 0.15, 0.45)
+        return (sequia * 0.35 + heladas * 0.25 + lluvias * 0.25 + plagas * 0.15) * factor_estacional
+    
+    riesgo_total = np.empty(len(sequia), dtype=np.float64)
+    _riesgo_climatico_lote(sequia, heladas, lluvias, temperatura,
+                           factor_estacional, riesgo_total)
+    return riesgo_total
+
 
 class RiesgoModel:
     """
@@ -34,6 +138,13 @@ class RiesgoModel:
             'medio': 0.67,
             'alto': 1.00
         }
+        
+        # Tabla de riesgos climáticos por región para cálculos en lote
+        self._tabla_climatica = pd.DataFrame.from_dict(
+            self.riesgos_climaticos, orient='index'
+        ).reindex(columns=['sequia', 'heladas', 'inundacion', 'temperatura_promedio']).fillna(
+            {'sequia': 0.3, 'heladas': 0.2, 'inundacion': 0.25, 'temperatura_promedio': 20}
+        )
     
     def _load_riesgos_climaticos(self) -> Dict:
         """Carga datos de riesgos climáticos por región"""
@@ -100,50 +211,38 @@ class RiesgoModel:
             region = 'Lima'  # Default
         
         riesgos = self.riesgos_climaticos[region]
+        sequia = riesgos.get('sequia', 0.3)
+        heladas = riesgos.get('heladas', 0.2)
+        lluvias = riesgos.get('inundacion', 0.25)
+        
+        # Ajuste estacional si se proporciona mes
+        factor_estacional = 1.0
+        if mes_siembra:
+            factor_estacional = self._calcular_factor_estacional(region, mes_siembra)
         
-        # Agregar factor de plagas (estimado)
-        riesgo_plagas = 0.25 + (riesgos.get('temperatura_promedio', 20) - 15) * 0.01
-        riesgo_plagas = max(0.15, min(riesgo_plagas, 0.45))
+        # Riesgo de plagas (estimado) y riesgo climático agregado con pesos
+        riesgo_plagas, riesgo_total = _riesgo_climatico_kernel(
+            sequia, heladas, lluvias,
+            riesgos.get('temperatura_promedio', 20), factor_estacional
+        )
         
         componentes = {
-            'sequia': riesgos.get('sequia', 0.3),
-            'heladas': riesgos.get('heladas', 0.2),
-            'lluvias': riesgos.get('inundacion', 0.25),
+            'sequia': sequia,
+            'heladas': heladas,
+            'lluvias': lluvias,
             'plagas': riesgo_plagas
         }
         
-        # Calcular riesgo climático agregado con pesos
-        riesgo_total = (
-            componentes['sequia'] * 0.35 +
-            componentes['heladas'] * 0.25 +
-            componentes['lluvias'] * 0.25 +
-            componentes['plagas'] * 0.15
-        )
-        
-        # Ajuste estacional si se proporciona mes
-        if mes_siembra:
-            factor_estacional = self._calcular_factor_estacional(region, mes_siembra)
-            riesgo_total *= factor_estacional
-        
         return {
             'componentes': componentes,
-            'riesgo_total': round(riesgo_total, 4),
+            'riesgo_total': float(np.round(riesgo_total, 4)),
             'categoria': self._categorizar_riesgo(riesgo_total)
         }
     
     def _calcular_factor_estacional(self, region: str, mes: int) -> float:
         """Calcula factor de ajuste estacional del riesgo"""
-        # Meses de mayor riesgo climático por región (simplificado)
-        meses_riesgo_alto = {
-            'Lima': [6, 7, 8, 9],  # Invierno
-            'Arequipa': [6, 7, 8],
-            'Junín': [1, 2, 3, 12],  # Temporada de lluvias
-            'Cusco': [1, 2, 3, 12],
-            'Piura': [1, 2, 3, 4]  # Lluvias/Niño
-        }
-        
-        if mes in meses_riesgo_alto.get(region, []):
-            return 1.15  # Incremento del 15% en meses críticos
+        if mes in _MESES_RIESGO_ALTO.get(region, ()):
+            return _FACTOR_MES_CRITICO
         return 1.0
     
     def calcular_riesgo_mercado(self, cultivo: str,
@@ -252,10 +351,13 @@ class RiesgoModel:
         )
         
         # Calcular IRA ponderado
-        ira = (
-            riesgo_clim['riesgo_total'] * self.pesos_ira['climatico'] +
-            riesgo_merc['riesgo_ajustado'] * self.pesos_ira['mercado'] +
-            riesgo_prod['riesgo'] * self.pesos_ira['produccion']
+        ira = _ira_kernel(
+            riesgo_clim['riesgo_total'],
+            riesgo_merc['riesgo_ajustado'],
+            riesgo_prod['riesgo'],
+            self.pesos_ira['climatico'],
+            self.pesos_ira['mercado'],
+            self.pesos_ira['produccion']
         )
         
         # Categorizar IRA
@@ -275,7 +377,7 @@ class RiesgoModel:
         )
         
         return {
-            'ira': round(ira, 4),
+            'ira': float(np.round(ira, 4)),
             'categoria': categoria,
             'color': color,
             'componentes': {
@@ -287,6 +389,74 @@ class RiesgoModel:
             'recomendaciones': recomendaciones
         }
     
+    def calcular_ira_batch(self,
+                           regiones: List[str],
+                           cultivo: str,
+                           rendimiento_minimo: float,
+                           rendimiento_probable: float,
+                           rendimiento_maximo: float,
+                           precio_esperado: float = None,
+                           mes_siembra: int = None) -> Dict[str, np.ndarray]:
+        """
+        Calcula el IRA del mismo cultivo y predicción en varias regiones a la vez.
+        
+        Args:
+            regiones: Lista de nombres de regiones
+            cultivo: Nombre del cultivo
+            rendimiento_minimo: Rendimiento mínimo esperado
+            rendimiento_probable: Rendimiento probable
+            rendimiento_maximo: Rendimiento máximo esperado
+            precio_esperado: Precio de venta esperado
+            mes_siembra: Mes de siembra
+            
+        Returns:
+            Diccionario de arrays (uno por región) con IRA, categoría y
+            riesgo de cada componente
+        """
+        # Parámetros climáticos de todas las regiones; las regiones sin
+        # datos usan los de Lima, igual que calcular_riesgo_climatico
+        valores = self._tabla_climatica.reindex(regiones)
+        sin_datos = valores['sequia'].isna().to_numpy()
+        valores = valores.to_numpy()
+        valores[sin_datos] = self._tabla_climatica.loc['Lima'].to_numpy()
+        sequia, heladas, lluvias, temperatura = valores.T
+        
+        factor_estacional = np.ones(len(regiones))
+        if mes_siembra:
+            # Regiones para las que el mes de siembra es crítico
+            criticas = [region for region, meses in _MESES_RIESGO_ALTO.items()
+                        if mes_siembra in meses]
+            nombres = np.where(sin_datos, 'Lima', np.asarray(regiones, dtype=object))
+            factor_estacional[np.isin(nombres, criticas)] = _FACTOR_MES_CRITICO
+        
+        riesgo_clim = np.round(_riesgo_climatico_regiones(
+            sequia, heladas, lluvias, temperatura, factor_estacional
+        ), 4)
+        
+        # Mercado y producción no dependen de la región
+        riesgo_merc = self.calcular_riesgo_mercado(cultivo, precio_esperado)['riesgo_ajustado']
+        riesgo_prod = self.calcular_riesgo_produccion(
+            rendimiento_minimo, rendimiento_probable, rendimiento_maximo
+        )['riesgo']
+        
+        # Se categoriza con el IRA sin redondear, igual que calcular_ira
+        ira = (
+            riesgo_clim * self.pesos_ira['climatico'] +
+            riesgo_merc * self.pesos_ira['mercado'] +
+            riesgo_prod * self.pesos_ira['produccion']
+        )
+        categoria = np.array(['BAJO', 'MEDIO', 'ALTO'])[np.searchsorted(
+            [self.umbrales['bajo'], self.umbrales['medio']], ira, side='right'
+        )]
+        
+        return {
+            'ira': np.round(ira, 4),
+            'categoria': categoria,
+            'climatico': riesgo_clim,
+            'mercado': np.full(len(regiones), riesgo_merc),
+            'produccion': np.full(len(regiones), riesgo_prod)
+        }
+    
     def generar_recomendaciones(self,
                                riesgo_climatico: Dict,
                                riesgo_mercado: Dict,
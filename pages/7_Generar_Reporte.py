@@ -1,10 +1,55 @@
 import streamlit as st
 from datetime import datetime
 import json
+import hashlib
+import os
 from pathlib import Path
 
 st.set_page_config(page_title="Generar Reporte", page_icon="📄", layout="wide")
 
+# Estilos del reporte HTML (minificados)
+_REPORTE_CSS = (
+    "body{font-family:'Segoe UI',Tahoma,Geneva,Verdana,sans-serif;line-height:1.6;color:#333;max-width:1200px;margin:0 auto;padding:20px;background-color:#f5f5f5}"
+    ".header{background:linear-gradient(135deg,#667eea 0%,#764ba2 100%);color:white;padding:30px;border-radius:10px;text-align:center;margin-bottom:30px}"
+    ".header h1{margin:0;font-size:2.5em}"
+    ".section{background:white;padding:25px;margin-bottom:20px;border-radius:8px;box-shadow:0 2px 4px rgba(0,0,0,0.1)}"
+    ".section h2{color:#667eea;border-bottom:3px solid #667eea;padding-bottom:10px;margin-top:0}"
+    ".metric{display:inline-block;background:#f8f9fa;padding:15px;margin:10px;border-radius:5px;min-width:200px}"
+    ".metric-label{font-size:0.9em;color:#666;margin-bottom:5px}"
+    ".metric-value{font-size:1.5em;font-weight:bold;color:#333}"
+    ".recomendacion{padding:30px;border-radius:10px;text-align:center;margin:20px 0}"
+    ".recomendacion h3{font-size:2em;margin:10px 0}"
+    "table{width:100%;border-collapse:collapse;margin:15px 0}"
+    "th,td{padding:12px;text-align:left;border-bottom:1px solid #ddd}"
+    "th{background-color:#667eea;color:white}"
+    "tr:hover{background-color:#f5f5f5}"
+    ".footer{text-align:center;padding:20px;color:#666;font-size:0.9em}"
+)
+
+# Plantillas de filas del reporte HTML
+_ESC_ROW = """
+            <tr>
+                <td>{nombre}</td>
+                <td>{rendimiento:,.0f} kg/ha</td>
+                <td>S/. {precio:.2f}/kg</td>
+                <td>S/. {ingreso:,.0f}</td>
+                <td>S/. {utilidad:,.0f}</td>
+                <td>S/. {van:,.0f}</td>
+            </tr>
+"""
+
+_REC_ITEM = "            <li>{texto}</li>\n"
+
+_MARCAS_RECOMENDACION = ('**', '🚰', '❄️', '💰', '📊', '⚠️')
+
+
+def _limpiar_recomendacion(texto: str) -> str:
+    """Quita marcas de formato y emojis de una recomendación"""
+    for marca in _MARCAS_RECOMENDACION:
+        texto = texto.replace(marca, '')
+    return texto
+
+
 st.title("📄 Generación de Reporte Ejecutivo")
 st.markdown("---")
 
@@ -65,94 +110,7 @@ reporte_html = f"""
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Reporte AgroShield 360</title>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }}
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 30px;
-            border-radius: 10px;
-            text-align: center;
-            margin-bottom: 30px;
-        }}
-        .header h1 {{
-            margin: 0;
-            font-size: 2.5em;
-        }}
-        .section {{
-            background: white;
-            padding: 25px;
-            margin-bottom: 20px;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .section h2 {{
-            color: #667eea;
-            border-bottom: 3px solid #667eea;
-            padding-bottom: 10px;
-            margin-top: 0;
-        }}
-        .metric {{
-            display: inline-block;
-            background: #f8f9fa;
-            padding: 15px;
-            margin: 10px;
-            border-radius: 5px;
-            min-width: 200px;
-        }}
-        .metric-label {{
-            font-size: 0.9em;
-            color: #666;
-            margin-bottom: 5px;
-        }}
-        .metric-value {{
-            font-size: 1.5em;
-            font-weight: bold;
-            color: #333;
-        }}
-        .recomendacion {{
-            background: {recomendacion['color']};
-            padding: 30px;
-            border-radius: 10px;
-            text-align: center;
-            margin: 20px 0;
-        }}
-        .recomendacion h3 {{
-            font-size: 2em;
-            margin: 10px 0;
-        }}
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 15px 0;
-        }}
-        th, td {{
-            padding: 12px;
-            text-align: left;
-            border-bottom: 1px solid #ddd;
-        }}
-        th {{
-            background-color: #667eea;
-            color: white;
-        }}
-        tr:hover {{
-            background-color: #f5f5f5;
-        }}
-        .footer {{
-            text-align: center;
-            padding: 20px;
-            color: #666;
-            font-size: 0.9em;
-        }}
-    </style>
+    <style>{_REPORTE_CSS}.recomendacion{{background:{recomendacion['color']}}}</style>
 </head>
 <body>
     <div class="header">
@@ -251,8 +209,10 @@ reporte_html = f"""
         <ul>
 """
 
-for rec in riesgos.get('recomendaciones', []):
-    reporte_html += f"            <li>{rec.replace('**', '').replace('🚰', '').replace('❄️', '').replace('💰', '').replace('📊', '').replace('⚠️', '')}</li>\n"
+reporte_html += "".join([
+    _REC_ITEM.format(texto=_limpiar_recomendacion(rec))
+    for rec in riesgos.get('recomendaciones', [])
+])
 
 reporte_html += """
         </ul>
@@ -303,17 +263,10 @@ reporte_html += """
             </tr>
 """
 
-for nombre, esc in escenarios.items():
-    reporte_html += f"""
-            <tr>
-                <td>{nombre}</td>
-                <td>{esc['rendimiento']:,.0f} kg/ha</td>
-                <td>S/. {esc['precio']:.2f}/kg</td>
-                <td>S/. {esc['ingreso']:,.0f}</td>
-                <td>S/. {esc['utilidad']:,.0f}</td>
-                <td>S/. {esc['van']:,.0f}</td>
-            </tr>
-"""
+reporte_html += "".join([
+    _ESC_ROW.format(nombre=nombre, **esc)
+    for nombre, esc in escenarios.items()
+])
 
 reporte_html += f"""
         </table>
@@ -451,8 +404,7 @@ AgroShield 360 © 2024
 with col5:
     if formato_reporte == "JSON":
         # Generar versión JSON
-        reporte_json = {
-            'fecha_generacion': fecha_reporte,
+        contenido_reporte = {
             'datos_productor': datos,
             'prediccion_rendimiento': prediccion,
             'analisis_riesgos': riesgos,
@@ -461,20 +413,32 @@ with col5:
             'recomendacion_final': recomendacion
         }
 
+        # Huella del contenido (sin marcas de tiempo) para detectar cambios
+        huella_reporte = hashlib.blake2b(
+            json.dumps(contenido_reporte, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"),
+            digest_size=16
+        ).digest()
+
+        reporte_json = {'fecha_generacion': fecha_reporte, **contenido_reporte}
         reporte_json["meta"] = {
             "formato_origen": "json",
             "fecha_generacion_iso": datetime.now().isoformat()
         }
+        reporte_json_texto = json.dumps(reporte_json, indent=2, ensure_ascii=False, default=str)
+
         ruta_reporte = Path("reports/reporte_final.json")
-        ruta_reporte.parent.mkdir(exist_ok=True)
 
-        with open(ruta_reporte, "w", encoding="utf-8") as f:
-            json.dump(reporte_json, f, indent=2, ensure_ascii=False, default=str)
+        # Solo reescribir el archivo si el contenido cambió
+        if st.session_state.get("_last_report_hash") != huella_reporte or not ruta_reporte.exists():
+            ruta_reporte.parent.mkdir(exist_ok=True)
+            ruta_temporal = ruta_reporte.with_suffix(".json.tmp")
+            ruta_temporal.write_text(reporte_json_texto, encoding="utf-8")
+            os.replace(ruta_temporal, ruta_reporte)
+            st.session_state["_last_report_hash"] = huella_reporte
 
-        
         st.download_button(
             label="📥 Descargar JSON",
-            data=json.dumps(reporte_json, indent=2, ensure_ascii=False, default=str),
+            data=reporte_json_texto,
             file_name=f"reporte_agroshield_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
             mime="application/json",
             type="primary",
@@ -5,10 +5,113 @@ Servicios para análisis financiero de proyectos agrícolas.
 """
 
 import numpy as np
-from numpy_financial import npv, irr
+from numpy_financial import irr
+from functools import lru_cache
 from typing import Dict, List, Tuple
 import pandas as pd
 
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError:  # Numba es opcional
+    _NUMBA_AVAILABLE = False
+
+
+@lru_cache(maxsize=64)
+def factores_descuento(tasa: float, n_periodos: int) -> np.ndarray:
+    """
+    Factores de descuento 1/(1+tasa)^t para t = 0..n_periodos-1.
+    
+    Args:
+        tasa: Tasa de descuento por periodo
+        n_periodos: Número de periodos
+        
+    Returns:
+        Array de solo lectura (compartido entre llamadas) con los factores
+    """
+    factores = 1.0 / (1.0 + tasa) ** np.arange(n_periodos, dtype=np.float64)
+    factores.setflags(write=False)
+    return factores
+
+
+@lru_cache(maxsize=16)
+def plantilla_flujo(meses: int) -> np.ndarray:
+    """
+    Pesos del flujo de caja mensual por unidad de inversión.
+    
+    Args:
+        meses: Duración del ciclo en meses
+        
+    Returns:
+        Array de solo lectura (compartido entre llamadas) de meses + 1 pesos
+    """
+    plantilla = np.empty(meses + 1)
+    plantilla[0] = -0.3
+    plantilla[1:meses] = -0.7 / (meses - 1) if meses > 1 else 0.0
+    plantilla[-1] = 0.0
+    plantilla.setflags(write=False)
+    return plantilla
+
+
+def _npv_kernel(tasa: float, flujo: np.ndarray) -> float:
+    """VAN en un solo bucle acumulando el factor de descuento"""
+    total = 0.0
+    descuento = 1.0
+    for t in range(flujo.size):
+        total += flujo[t] / descuento
+        descuento *= 1.0 + tasa
+    return total
+
+
+if _NUMBA_AVAILABLE:
+    _npv_kernel = njit(fastmath=True, cache=True)(_npv_kernel)
+
+
+def _fast_npv(tasa: float, flujo) -> float:
+    """VAN de un flujo de caja como producto punto con los factores de descuento"""
+    flujo = np.asarray(flujo, dtype=np.float64)
+    if _NUMBA_AVAILABLE:
+        return float(_npv_kernel(tasa, flujo))
+    return float(np.dot(flujo, factores_descuento(tasa, flujo.size)))
+
+
+def _fast_irr(flujo, max_iter: int = 20, tol: float = 1e-8) -> float:
+    """
+    TIR por periodo mediante Newton-Raphson.
+    
+    Args:
+        flujo: Flujo de caja por período (lista o array)
+        max_iter: Máximo de iteraciones de Newton
+        tol: Tolerancia sobre el paso de la tasa
+        
+    Returns:
+        TIR por periodo, o NaN si el flujo no tiene raíz
+    """
+    flujo = np.asarray(flujo, dtype=np.float64)
+    ingresos = flujo[flujo > 0].sum()
+    egresos = -flujo[flujo < 0].sum()
+    if ingresos <= 0 or egresos <= 0:
+        return np.nan
+    
+    # Punto de partida: retorno total repartido entre los períodos
+    t = np.arange(flujo.size, dtype=np.float64)
+    tasa = (ingresos / egresos) ** (1.0 / max(flujo.size - 1, 1)) - 1.0
+    for _ in range(max_iter):
+        potencias = (1.0 + tasa) ** t
+        f = np.dot(flujo, 1.0 / potencias)
+        fp = -np.dot(t * flujo, 1.0 / (potencias * (1.0 + tasa)))
+        if fp == 0:
+            break
+        paso = f / fp
+        tasa -= paso
+        if not np.isfinite(tasa) or tasa <= -1.0:
+            break
+        if abs(paso) < tol:
+            return float(tasa)
+    
+    # Newton no convergió: se recurre al método general por raíces
+    return float(irr(flujo))
+
 
 class EconomiaService:
     """Servicio para evaluación económica y financiera"""
@@ -20,7 +123,7 @@ class EconomiaService:
                            inversion_inicial: float,
                            ingresos_totales: float,
                            costos_operativos: float,
-                           duracion_meses: int) -> List[float]:
+                           duracion_meses: int) -> np.ndarray:
         """
         Genera el flujo de caja del proyecto.
         
@@ -31,33 +134,26 @@ class EconomiaService:
             duracion_meses: Duración del proyecto en meses
             
         Returns:
-            Lista con flujo de caja por período
+            Array con flujo de caja por período
         """
-        flujo = []
-        
-        # Mes 0: Inversión inicial (30% del total)
-        flujo.append(-inversion_inicial * 0.3)
+        meses = max(duracion_meses, 1)
         
-        # Meses intermedios: Costos operativos distribuidos
-        if duracion_meses > 1:
-            costo_mensual = (inversion_inicial * 0.7) / (duracion_meses - 1)
-            for _ in range(1, duracion_meses):
-                flujo.append(-costo_mensual)
+        # Mes 0: 30% de la inversión; meses intermedios: 70% distribuido
+        flujo = plantilla_flujo(meses) * inversion_inicial
         
         # Último mes: Ingresos - último costo
-        ingreso_final = ingresos_totales - (inversion_inicial * 0.7 / duracion_meses if duracion_meses > 1 else 0)
-        flujo.append(ingreso_final)
+        flujo[-1] = ingresos_totales - (inversion_inicial * 0.7 / meses if meses > 1 else 0)
         
         return flujo
     
     def calcular_van_tir(self,
-                        flujo_caja: List[float],
+                        flujo_caja: np.ndarray,
                         tasa_descuento_anual: float = None) -> Dict:
         """
         Calcula VAN (VPN) y TIR del proyecto.
         
         Args:
-            flujo_caja: Lista con flujo de caja por período
+            flujo_caja: Flujo de caja por período (lista o array)
             tasa_descuento_anual: Tasa de descuento anual (default: 12%)
             
         Returns:
@@ -70,14 +166,11 @@ class EconomiaService:
         tasa_mensual = tasa_descuento_anual / 12
         
         # Calcular VAN
-        van = npv(tasa_mensual, flujo_caja)
+        van = _fast_npv(tasa_mensual, flujo_caja)
         
         # Calcular TIR
-        try:
-            tir_mensual = irr(flujo_caja)
-            tir_anual = (1 + tir_mensual) ** 12 - 1
-        except:
-            tir_anual = None
+        tir_mensual = _fast_irr(flujo_caja)
+        tir_anual = (1 + tir_mensual) ** 12 - 1
         
         # Análisis de viabilidad
         viabilidad = "VIABLE" if van > 0 else "NO VIABLE"
@@ -88,7 +181,7 @@ class EconomiaService:
             'tir_porcentaje': round(tir_anual * 100, 2) if tir_anual else None,
             'viabilidad': viabilidad,
             'tasa_descuento': tasa_descuento_anual,
-            'flujo_caja': flujo_caja
+            'flujo_caja': np.asarray(flujo_caja).tolist()
         }
     
     def calcular_punto_equilibrio(self,
@@ -166,29 +259,33 @@ class EconomiaService:
         
         # Período de recuperación
         flujo_acumulado = np.cumsum(flujo)
-        periodo_recuperacion = None
-        for i, acum in enumerate(flujo_acumulado):
-            if acum >= 0:
-                periodo_recuperacion = i
-                break
+        recuperado = flujo_acumulado >= 0
+        periodo_recuperacion = int(recuperado.argmax()) if recuperado.any() else None
         
         # Índice de rentabilidad
         inversion_inicial = abs(flujo[0])
-        van_flujos_positivos = sum([f / ((1 + (tasa_descuento or self.tasa_descuento_default)/12) ** i) 
-                                   for i, f in enumerate(flujo) if f > 0])
+        descuento = factores_descuento(
+            (tasa_descuento or self.tasa_descuento_default) / 12, flujo.size
+        )
+        positivos = flujo > 0
+        van_flujos_positivos = float(np.dot(flujo[positivos], descuento[positivos]))
         indice_rentabilidad = van_flujos_positivos / inversion_inicial if inversion_inicial > 0 else 0
         
+        utilidad_bruta, margen_utilidad, roi, indice_rentabilidad = np.round(
+            [utilidad_bruta, margen_utilidad, roi, indice_rentabilidad], 2
+        ).tolist()
+        
         return {
-            'utilidad_bruta': round(utilidad_bruta, 2),
-            'margen_utilidad': round(margen_utilidad, 2),
-            'roi': round(roi, 2),
+            'utilidad_bruta': utilidad_bruta,
+            'margen_utilidad': margen_utilidad,
+            'roi': roi,
             'van': van_tir['van'],
             'tir_anual': van_tir['tir_anual'],
             'tir_porcentaje': van_tir['tir_porcentaje'],
             'viabilidad': van_tir['viabilidad'],
             'periodo_recuperacion_meses': periodo_recuperacion,
-            'indice_rentabilidad': round(indice_rentabilidad, 2),
-            'flujo_caja': flujo,
+            'indice_rentabilidad': indice_rentabilidad,
+            'flujo_caja': flujo.tolist(),
             'flujo_acumulado': flujo_acumulado.tolist()
         }
     
@@ -210,30 +307,22 @@ class EconomiaService:
         if variacion_porcentaje is None:
             variacion_porcentaje = [-30, -20, -10, 0, 10, 20, 30]
         
-        resultados = []
-        
-        for var in variacion_porcentaje:
-            factor = 1 + (var / 100)
-            
-            # Escenarios
-            ing_var = ingresos_base * factor
-            utilidad_ing = ing_var - costos_base
-            
-            cost_var = costos_base * factor
-            utilidad_cost = ingresos_base - cost_var
-            
-            ambos_var_opt = (ingresos_base * factor) - (costos_base / factor)
-            ambos_var_pes = (ingresos_base / factor) - (costos_base * factor)
-            
-            resultados.append({
-                'Variación (%)': var,
-                'Utilidad (Var. Ingresos)': round(utilidad_ing, 2),
-                'Utilidad (Var. Costos)': round(utilidad_cost, 2),
-                'Utilidad (Escenario Optimista)': round(ambos_var_opt, 2),
-                'Utilidad (Escenario Pesimista)': round(ambos_var_pes, 2)
-            })
-        
-        return pd.DataFrame(resultados)
+        variaciones = np.asarray(variacion_porcentaje)
+        factor = 1 + (variaciones / 100)
+        
+        # Escenarios (todas las variaciones a la vez)
+        utilidad_ing = ingresos_base * factor - costos_base
+        utilidad_cost = ingresos_base - costos_base * factor
+        ambos_var_opt = (ingresos_base * factor) - (costos_base / factor)
+        ambos_var_pes = (ingresos_base / factor) - (costos_base * factor)
+        
+        return pd.DataFrame({
+            'Variación (%)': variaciones,
+            'Utilidad (Var. Ingresos)': np.round(utilidad_ing, 2),
+            'Utilidad (Var. Costos)': np.round(utilidad_cost, 2),
+            'Utilidad (Escenario Optimista)': np.round(ambos_var_opt, 2),
+            'Utilidad (Escenario Pesimista)': np.round(ambos_var_pes, 2)
+        })
     
     def calcular_ratios_financieros(self,
                                    activos_totales: float,
@@ -269,13 +358,17 @@ class EconomiaService:
         # Margen neto
         margen_neto = (utilidad_neta / ingresos * 100) if ingresos > 0 else 0
         
+        valores = np.round(
+            [ratio_endeudamiento, ratio_autonomia, roa, roe, margen_neto, patrimonio], 2
+        ).tolist()
+        
         return {
-            'ratio_endeudamiento': round(ratio_endeudamiento, 2),
-            'ratio_autonomia': round(ratio_autonomia, 2),
-            'roa': round(roa, 2),
-            'roe': round(roe, 2),
-            'margen_neto': round(margen_neto, 2),
-            'patrimonio': round(patrimonio, 2)
+            'ratio_endeudamiento': valores[0],
+            'ratio_autonomia': valores[1],
+            'roa': valores[2],
+            'roe': valores[3],
+            'margen_neto': valores[4],
+            'patrimonio': valores[5]
         }
 
 
@@ -292,7 +385,6 @@ def calcular_viabilidad_rapida(inversion: float, ingresos: float,
     Returns:
         Dict con evaluación básica
     """
-    servicio = EconomiaService()
     utilidad = ingresos - costos
     roi = (utilidad / costos * 100) if costos > 0 else 0
     
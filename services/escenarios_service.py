@@ -6,8 +6,58 @@ Servicios para simulación y análisis de escenarios agrícolas.
 
 import numpy as np
 import pandas as pd
+from types import MappingProxyType
 from typing import Dict, List
-from numpy_financial import npv
+
+from services.economia_service import factores_descuento, plantilla_flujo
+
+try:
+    from numba import njit, prange
+    _NUMBA_AVAILABLE = True
+except ImportError:  # Numba es opcional
+    _NUMBA_AVAILABLE = False
+
+
+if _NUMBA_AVAILABLE:
+    @njit(fastmath=True, cache=True, parallel=True)
+    def _mc_kernel(rendimientos, precios, piso_rend, piso_precio, area, costos, out):
+        """Recorta y calcula la utilidad de cada simulación en una sola pasada"""
+        for i in prange(rendimientos.size):
+            out[i] = (max(rendimientos[i], piso_rend) * area *
+                      max(precios[i], piso_precio) - costos)
+
+
+# Escenarios estándar (inmutables, construidos una sola vez)
+ESCENARIOS_DEFAULT = MappingProxyType({
+    'Pesimista': MappingProxyType({
+        'factor_rendimiento': 0.80,
+        'factor_precio': 0.85,
+        'descripcion': 'Condiciones desfavorables'
+    }),
+    'Base': MappingProxyType({
+        'factor_rendimiento': 1.00,
+        'factor_precio': 1.00,
+        'descripcion': 'Condiciones esperadas'
+    }),
+    'Optimista': MappingProxyType({
+        'factor_rendimiento': 1.20,
+        'factor_precio': 1.15,
+        'descripcion': 'Condiciones favorables'
+    })
+})
+
+
+def _matriz_factores(escenarios) -> np.ndarray:
+    """Matriz (n_escenarios, 2) con factores de rendimiento y precio"""
+    factores = np.array(
+        [[c['factor_rendimiento'], c['factor_precio']] for c in escenarios.values()],
+        dtype=np.float64
+    ).reshape(-1, 2)
+    factores.setflags(write=False)
+    return factores
+
+
+_FACTORES_DEFAULT = _matriz_factores(ESCENARIOS_DEFAULT)
 
 
 class EscenariosService:
@@ -15,23 +65,7 @@ class EscenariosService:
     
     def __init__(self):
         # Definir escenarios estándar
-        self.escenarios_default = {
-            'Pesimista': {
-                'factor_rendimiento': 0.80,
-                'factor_precio': 0.85,
-                'descripcion': 'Condiciones desfavorables'
-            },
-            'Base': {
-                'factor_rendimiento': 1.00,
-                'factor_precio': 1.00,
-                'descripcion': 'Condiciones esperadas'
-            },
-            'Optimista': {
-                'factor_rendimiento': 1.20,
-                'factor_precio': 1.15,
-                'descripcion': 'Condiciones favorables'
-            }
-        }
+        self.escenarios_default = ESCENARIOS_DEFAULT
     
     def simular_escenarios(self,
                           rendimiento_base: float,
@@ -59,37 +93,54 @@ class EscenariosService:
         if escenarios is None:
             escenarios = self.escenarios_default
         
+        if escenarios is ESCENARIOS_DEFAULT:
+            factores = _FACTORES_DEFAULT
+        else:
+            factores = _matriz_factores(escenarios)
+        
+        # Calcular rendimiento y precio ajustados de todos los escenarios
+        rendimientos = rendimiento_base * factores[:, 0]
+        precios = precio_base * factores[:, 1]
+        
+        # Calcular producción e ingresos
+        producciones = rendimientos * area
+        ingresos = producciones * precios
+        
+        # Calcular utilidad
+        utilidades = ingresos - costos_totales
+        margenes = np.divide(utilidades, ingresos, out=np.zeros_like(ingresos),
+                             where=ingresos > 0) * 100
+        rois = (utilidades / costos_totales * 100 if costos_totales > 0
+                else np.zeros_like(utilidades))
+        
+        # Calcular VAN simplificado con factores de descuento comunes.
+        # El flujo de costos es igual en todos los escenarios; solo los
+        # ingresos del último período cambian.
+        tasa_mensual = tasa_descuento / 12
+        descuento = factores_descuento(tasa_mensual, max(duracion_meses, 1) + 1)
+        flujo_costos = self._generar_flujo_simple(costos_totales, 0.0, duracion_meses)
+        vans = float(np.dot(flujo_costos, descuento)) + ingresos * descuento[-1]
+        
+        # Redondear todas las métricas en una sola operación
+        metricas = np.round(np.column_stack((
+            rendimientos, precios, producciones, ingresos,
+            utilidades, margenes, rois, vans
+        )), 2).tolist()
+        
         resultados = {}
         
-        for nombre, config in escenarios.items():
-            # Calcular rendimiento y precio ajustados
-            rendimiento_ajustado = rendimiento_base * config['factor_rendimiento']
-            precio_ajustado = precio_base * config['factor_precio']
-            
-            # Calcular producción e ingresos
-            produccion = rendimiento_ajustado * area
-            ingresos = produccion * precio_ajustado
-            
-            # Calcular utilidad
-            utilidad = ingresos - costos_totales
-            margen = (utilidad / ingresos * 100) if ingresos > 0 else 0
-            roi = (utilidad / costos_totales * 100) if costos_totales > 0 else 0
-            
-            # Calcular VAN simplificado
-            tasa_mensual = tasa_descuento / 12
-            flujo = self._generar_flujo_simple(costos_totales, ingresos, duracion_meses)
-            van = npv(tasa_mensual, flujo)
-            
+        for (nombre, config), (rend, precio, prod, ing, util, margen, roi, van) in zip(
+                escenarios.items(), metricas):
             resultados[nombre] = {
-                'rendimiento': round(rendimiento_ajustado, 2),
-                'precio': round(precio_ajustado, 2),
-                'produccion': round(produccion, 2),
-                'ingresos': round(ingresos, 2),
+                'rendimiento': rend,
+                'precio': precio,
+                'produccion': prod,
+                'ingresos': ing,
                 'costos': costos_totales,
-                'utilidad': round(utilidad, 2),
-                'margen': round(margen, 2),
-                'roi': round(roi, 2),
-                'van': round(van, 2),
+                'utilidad': util,
+                'margen': margen,
+                'roi': roi,
+                'van': van,
                 'descripcion': config.get('descripcion', ''),
                 'factores': {
                     'rendimiento': config['factor_rendimiento'],
@@ -100,17 +151,11 @@ class EscenariosService:
         return resultados
     
     def _generar_flujo_simple(self, costos: float, ingresos: float, 
-                             meses: int) -> List[float]:
+                             meses: int) -> np.ndarray:
         """Genera flujo de caja simplificado"""
-        flujo = [-costos * 0.3]
-        
-        if meses > 1:
-            costo_mensual = (costos * 0.7) / (meses - 1)
-            for _ in range(1, meses):
-                flujo.append(-costo_mensual)
-        
-        ingreso_final = ingresos - (costos * 0.7 / meses if meses > 1 else 0)
-        flujo.append(ingreso_final)
+        meses = max(meses, 1)
+        flujo = plantilla_flujo(meses) * costos
+        flujo[-1] = ingresos - (costos * 0.7 / meses if meses > 1 else 0)
         
         return flujo
     
@@ -124,21 +169,22 @@ class EscenariosService:
         Returns:
             DataFrame con comparación
         """
-        datos = []
+        n = len(resultados_escenarios)
+        resultados = resultados_escenarios.values()
         
-        for nombre, resultado in resultados_escenarios.items():
-            datos.append({
-                'Escenario': nombre,
-                'Rendimiento (kg/ha)': resultado['rendimiento'],
-                'Precio (S/./kg)': resultado['precio'],
-                'Ingresos (S/.)': resultado['ingresos'],
-                'Utilidad (S/.)': resultado['utilidad'],
-                'Margen (%)': resultado['margen'],
-                'ROI (%)': resultado['roi'],
-                'VAN (S/.)': resultado['van']
-            })
+        def columna(clave: str) -> np.ndarray:
+            return np.fromiter((r[clave] for r in resultados), dtype=np.float64, count=n)
         
-        return pd.DataFrame(datos)
+        return pd.DataFrame({
+            'Escenario': list(resultados_escenarios.keys()),
+            'Rendimiento (kg/ha)': columna('rendimiento'),
+            'Precio (S/./kg)': columna('precio'),
+            'Ingresos (S/.)': columna('ingresos'),
+            'Utilidad (S/.)': columna('utilidad'),
+            'Margen (%)': columna('margen'),
+            'ROI (%)': columna('roi'),
+            'VAN (S/.)': columna('van')
+        })
     
     def analisis_sensibilidad_bivariado(self,
                                        rendimiento_base: float,
@@ -167,24 +213,22 @@ class EscenariosService:
         if variaciones_precio is None:
             variaciones_precio = [-0.3, -0.2, -0.1, 0, 0.1, 0.2, 0.3]
         
-        resultados = []
+        # Malla (rendimiento x precio); filas en el mismo orden que el doble bucle
+        var_rend, var_precio = np.meshgrid(
+            np.asarray(variaciones_rend, dtype=np.float64),
+            np.asarray(variaciones_precio, dtype=np.float64),
+            indexing='ij'
+        )
         
-        for var_rend in variaciones_rend:
-            for var_precio in variaciones_precio:
-                rend = rendimiento_base * (1 + var_rend)
-                precio = precio_base * (1 + var_precio)
-                
-                produccion = rend * area
-                ingresos = produccion * precio
-                utilidad = ingresos - costos
-                
-                resultados.append({
-                    'Var_Rendimiento (%)': round(var_rend * 100, 0),
-                    'Var_Precio (%)': round(var_precio * 100, 0),
-                    'Utilidad (S/.)': round(utilidad, 2)
-                })
+        rend = rendimiento_base * (1 + var_rend)
+        precio = precio_base * (1 + var_precio)
+        utilidad = rend * area * precio - costos
         
-        return pd.DataFrame(resultados)
+        return pd.DataFrame({
+            'Var_Rendimiento (%)': np.round(var_rend * 100, 0).ravel(),
+            'Var_Precio (%)': np.round(var_precio * 100, 0).ravel(),
+            'Utilidad (S/.)': np.round(utilidad, 2).ravel()
+        })
     
     def simular_monte_carlo(self,
                            rendimiento_medio: float,
@@ -207,47 +251,50 @@ class EscenariosService:
             n_simulaciones: Número de simulaciones
             
         Returns:
-            Dict con estadísticas de la simulación
+            Dict con estadísticas de la simulación; 'utilidades_simuladas'
+            es el ndarray de utilidades (sin convertir a lista)
         """
-        np.random.seed(42)
+        rng = np.random.Generator(np.random.SFC64(42))
         
         # Generar simulaciones
-        rendimientos = np.random.normal(
+        rendimientos = rng.normal(
             rendimiento_medio,
             rendimiento_medio * volatilidad_rend,
             n_simulaciones
         )
-        
-        precios = np.random.normal(
+        precios = rng.normal(
             precio_medio,
             precio_medio * volatilidad_precio,
             n_simulaciones
         )
         
-        # Asegurar valores positivos
-        rendimientos = np.maximum(rendimientos, rendimiento_medio * 0.3)
-        precios = np.maximum(precios, precio_medio * 0.3)
-        
-        # Calcular utilidades
-        producciones = rendimientos * area
-        ingresos = producciones * precios
-        utilidades = ingresos - costos
+        # Calcular utilidades reutilizando el buffer de rendimientos
+        # (asegurando valores positivos)
+        utilidades = rendimientos
+        if _NUMBA_AVAILABLE:
+            _mc_kernel(rendimientos, precios, rendimiento_medio * 0.3,
+                       precio_medio * 0.3, area, costos, utilidades)
+        else:
+            np.maximum(rendimientos, rendimiento_medio * 0.3, out=rendimientos)
+            np.maximum(precios, precio_medio * 0.3, out=precios)
+            utilidades *= area
+            utilidades *= precios
+            utilidades -= costos
         
         # Estadísticas
-        utilidad_media = np.mean(utilidades)
-        utilidad_mediana = np.median(utilidades)
-        desv_std = np.std(utilidades)
+        utilidad_media = utilidades.mean()
+        desv_std = utilidades.std()
         
-        # Percentiles
-        percentil_5 = np.percentile(utilidades, 5)
-        percentil_25 = np.percentile(utilidades, 25)
-        percentil_75 = np.percentile(utilidades, 75)
-        percentil_95 = np.percentile(utilidades, 95)
+        # Percentiles y mediana en una sola pasada
+        (percentil_5, percentil_25, utilidad_mediana,
+         percentil_75, percentil_95) = np.quantile(
+            utilidades, [0.05, 0.25, 0.50, 0.75, 0.95]
+        )
         
         # Probabilidades
-        prob_perdida = np.sum(utilidades < 0) / n_simulaciones
-        prob_utilidad_baja = np.sum(utilidades < utilidad_media * 0.5) / n_simulaciones
-        prob_utilidad_alta = np.sum(utilidades > utilidad_media * 1.5) / n_simulaciones
+        prob_perdida = (utilidades < 0).mean()
+        prob_utilidad_baja = (utilidades < utilidad_media * 0.5).mean()
+        prob_utilidad_alta = (utilidades > utilidad_media * 1.5).mean()
         
         return {
             'utilidad_media': round(utilidad_media, 2),
@@ -261,7 +308,7 @@ class EscenariosService:
             'probabilidad_utilidad_baja': round(prob_utilidad_baja, 4),
             'probabilidad_utilidad_alta': round(prob_utilidad_alta, 4),
             'n_simulaciones': n_simulaciones,
-            'utilidades_simuladas': utilidades.tolist()
+            'utilidades_simuladas': utilidades
         }
     
     def calcular_valor_esperado(self, 
@@ -275,15 +322,13 @@ class EscenariosService:
         Returns:
             Dict con valor esperado y análisis
         """
-        valor_esperado = 0
-        suma_probabilidades = 0
+        datos = list(escenarios_probabilidades.values())
+        n = len(datos)
+        resultados = np.fromiter((d['resultado'] for d in datos), dtype=np.float64, count=n)
+        probabilidades = np.fromiter((d['probabilidad'] for d in datos), dtype=np.float64, count=n)
         
-        for escenario, datos in escenarios_probabilidades.items():
-            resultado = datos['resultado']
-            probabilidad = datos['probabilidad']
-            
-            valor_esperado += resultado * probabilidad
-            suma_probabilidades += probabilidad
+        valor_esperado = float(resultados @ probabilidades)
+        suma_probabilidades = float(probabilidades.sum())
         
         # Validar que las probabilidades sumen 1
         if abs(suma_probabilidades - 1.0) > 0.01:
@@ -299,6 +344,10 @@ class EscenariosService:
         }
 
 
+# Instancia compartida para las funciones auxiliares
+_SERVICIO_DEFAULT = EscenariosService()
+
+
 def simular_escenarios_rapido(rendimiento: float, precio: float,
                               area: float, costos: float) -> Dict:
     """
@@ -313,12 +362,11 @@ def simular_escenarios_rapido(rendimiento: float, precio: float,
     Returns:
         Dict con resultados de escenarios
     """
-    servicio = EscenariosService()
-    return servicio.simular_escenarios(
+    return _SERVICIO_DEFAULT.simular_escenarios(
         rendimiento_base=rendimiento,
         precio_base=precio,
         area=area,
         costos_totales=costos,
         tasa_descuento=0.12,
         duracion_meses=4
-    )
\ No newline at end of file
+    )
@@ -4,12 +4,272 @@ Servicio de Recomendación
 Sistema inteligente de recomendaciones para proyectos agrícolas.
 """
 
+import sys
+from bisect import bisect_left, bisect_right
+import numpy as np
+from dataclasses import dataclass
 from typing import Dict, List, Tuple
 
 
+# Tablas de puntuación por tramos: umbrales ordenados y puntos por tramo.
+# Las escalas "mayor que" se evalúan con side='left' y las "menor que"
+# con side='right', reproduciendo las comparaciones estrictas originales.
+# Son tuplas para que el caso escalar use bisect sin crear arrays.
+_ROI_UMBRALES = (0, 10, 20, 30, 50)
+_ROI_PUNTOS = (0, 5, 7, 10, 12, 15)
+
+_MARGEN_UMBRALES = (0, 10, 15, 20, 30)
+_MARGEN_PUNTOS = (0, 3, 5, 7, 8, 10)
+
+_IRA_UMBRALES = (0.33, 0.40, 0.50, 0.67, 0.80)
+_IRA_PUNTOS = (30, 25, 22, 15, 8, 0)
+
+_VAN_PESIMISTA_UMBRALES = (-1000, 0)
+_VAN_PESIMISTA_PUNTOS = (0, 5, 10)
+
+_VARIABILIDAD_UMBRALES = (1.0, 1.5, 2.0)
+_VARIABILIDAD_PUNTOS = (10, 8, 6, 2)
+
+_PE_FACTORES = (0.5, 0.7, 0.9)
+_PE_PUNTOS = (5, 3, 1, 0)
+
+_VOLATILIDAD_UMBRALES = (0.20, 0.30, 0.40)
+_VOLATILIDAD_PUNTOS = (5, 4, 2, 1)
+
+# Puntaje máximo de cada criterio (rentabilidad, riesgo, escenarios, mercado)
+_MAXIMOS_CRITERIO = np.array([40, 30, 20, 10], dtype=np.float64)
+
+_DESVIACION_UMBRALES = (20, 40, 60)
+_NIVELES_CONFIANZA = ("Muy Alta", "Alta", "Media", "Baja (criterios desbalanceados)")
+
+# Recomendación rápida indexada por (VAN > 0, tramo de ROI, IRA < 0.5)
+_ROI_RAPIDO_UMBRALES = (10, 20)
+_RECOMENDACION_RAPIDA = (
+    # VAN <= 0
+    "NO RECOMENDADO", "NO RECOMENDADO",
+    "NO RECOMENDADO", "NO RECOMENDADO",
+    "NO RECOMENDADO", "NO RECOMENDADO",
+    # VAN > 0 y ROI <= 10
+    "NO RECOMENDADO", "NO RECOMENDADO",
+    # VAN > 0 y 10 < ROI <= 20
+    "VIABLE CON PRECAUCIONES", "VIABLE CON PRECAUCIONES",
+    # VAN > 0 y ROI > 20 (IRA >= 0.5, IRA < 0.5)
+    "VIABLE CON PRECAUCIONES", "RECOMENDADO"
+)
+
+# Textos de detalle por criterio, compartidos entre todas las puntuaciones
+_DETALLES_RENTABILIDAD = tuple(map(sys.intern, (
+    "Rentabilidad insuficiente",
+    "Rentabilidad positiva pero ajustada",
+    "Rentabilidad satisfactoria",
+    "Excelente rentabilidad en todos los indicadores"
+)))
+
+_DETALLE_RIESGO_ALTO = sys.intern(
+    "Nivel de riesgo alto, se requieren medidas de mitigación"
+)
+_DETALLES_RIESGO = {
+    'BAJO': sys.intern("Nivel de riesgo bajo y manejable"),
+    'MEDIO': sys.intern("Nivel de riesgo moderado, requiere monitoreo")
+}
+
+_DETALLES_ESCENARIOS = tuple(map(sys.intern, (
+    "Alta vulnerabilidad en condiciones adversas",
+    "Vulnerabilidad moderada en escenario pesimista",
+    "Proyecto viable incluso en escenario pesimista"
+)))
+
+_DETALLES_MERCADO = tuple(map(sys.intern, (
+    "Mercado estable con baja volatilidad",
+    "Volatilidad de precios moderada",
+    "Alta volatilidad de precios, considerar estrategias de cobertura"
+)))
+
+
+def _puntos_tramo(valor: float, umbrales: Tuple, puntos: Tuple,
+                  side: str = 'right') -> int:
+    """Puntos del tramo en el que cae el valor según los umbrales"""
+    busqueda = bisect_left if side == 'left' else bisect_right
+    return puntos[busqueda(umbrales, valor)]
+
+
+def _puntos_tramos(valores: np.ndarray, umbrales: Tuple, puntos: Tuple,
+                   side: str = 'right') -> np.ndarray:
+    """Versión vectorizada de _puntos_tramo para arrays de valores"""
+    return np.take(puntos, np.searchsorted(umbrales, valores, side=side))
+
+
+def _tramo_primer_menor(valor: float, umbrales: Tuple) -> int:
+    """
+    Índice del primer umbral mayor que el valor, como una cadena if/elif de '<'.
+    
+    A diferencia de bisect no exige umbrales ordenados: los del punto de
+    equilibrio se escalan por los ingresos y se invierten si son negativos.
+    """
+    for indice, umbral in enumerate(umbrales):
+        if valor < umbral:
+            return indice
+    return len(umbrales)
+
+
+def _volatilidad_mercado(riesgos: Dict) -> float:
+    """Volatilidad de precios del componente de mercado (0.5 si no existe)"""
+    return riesgos.get('componentes', {}).get('mercado', {}).get('volatilidad', 0.5)
+
+
+@dataclass(slots=True, frozen=True)
+class DetallesPuntuacion:
+    """Textos explicativos de cada criterio de la puntuación"""
+    rentabilidad: str
+    riesgo: str
+    escenarios: str
+    mercado: str
+    
+    def __getitem__(self, clave: str) -> str:
+        """Acceso por clave, compatible con el antiguo resultado en dict"""
+        return getattr(self, clave)
+    
+    def to_dict(self) -> Dict:
+        """Convierte los detalles a dict"""
+        return {
+            'rentabilidad': self.rentabilidad,
+            'riesgo': self.riesgo,
+            'escenarios': self.escenarios,
+            'mercado': self.mercado
+        }
+
+
+@dataclass(slots=True, frozen=True)
+class Puntuacion:
+    """Puntuación integral de un proyecto (inmutable)"""
+    puntuacion_total: int
+    puntos_rentabilidad: int
+    puntos_riesgo: int
+    puntos_escenarios: int
+    puntos_mercado: int
+    detalles: DetallesPuntuacion
+    
+    @property
+    def porcentaje(self) -> float:
+        """Puntuación total como porcentaje (máximo 100)"""
+        return round(self.puntuacion_total, 2)
+    
+    def __getitem__(self, clave: str):
+        """Acceso por clave, compatible con el antiguo resultado en dict"""
+        return getattr(self, clave)
+    
+    def to_dict(self) -> Dict:
+        """Convierte la puntuación al formato dict anterior"""
+        return {
+            'puntuacion_total': self.puntuacion_total,
+            'puntos_rentabilidad': self.puntos_rentabilidad,
+            'puntos_riesgo': self.puntos_riesgo,
+            'puntos_escenarios': self.puntos_escenarios,
+            'puntos_mercado': self.puntos_mercado,
+            'porcentaje': self.porcentaje,
+            'detalles': self.detalles.to_dict()
+        }
+
+
 class RecomendacionService:
     """Servicio para generar recomendaciones inteligentes"""
     
+    # Recomendaciones y acciones por tramo de puntaje:
+    # 0 = no recomendado, 1 = regular, 2 = buena, 3 = excelente
+    _RECOMENDACIONES = (
+        (
+            "NO SE RECOMIENDA SEMBRAR EN ESTA CAMPAÑA",
+            "❌",
+            "#FF6B6B",
+            """
+            **PROYECTO NO RECOMENDADO**
+            
+            El análisis indica riesgos y condiciones desfavorables:
+            - Rentabilidad insuficiente o negativa
+            - Riesgos elevados no mitigables en el corto plazo
+            - Condiciones de mercado adversas
+            - Vulnerabilidad alta ante cambios
+            
+            **Recomendación**: NO proceda con este proyecto. Evalúe alternativas 
+            completamente diferentes o espere condiciones más favorables en futuras campañas.
+            """
+        ),
+        (
+            "SE RECOMIENDA ROTAR O AJUSTAR CULTIVO",
+            "🔄",
+            "#FFA500",
+            """
+            **PROYECTO CON RIESGOS SIGNIFICATIVOS**
+            
+            El análisis sugiere considerar:
+            - Evaluar cultivos alternativos más rentables para la región
+            - Reducir costos de producción mediante optimización
+            - Mejorar tecnología y prácticas agronómicas
+            - Buscar mercados con mejores condiciones de precio
+            
+            **Recomendación**: Considere ajustar el plan antes de proceder o evalúe 
+            alternativas de cultivo más adecuadas.
+            """
+        ),
+        (
+            "CONVIENE SEMBRAR CON PRECAUCIONES",
+            "⚠️",
+            "#FFD93D",
+            """
+            **PROYECTO VIABLE CON CONSIDERACIONES**
+            
+            El proyecto es viable pero requiere atención a:
+            - Implementar medidas de mitigación de riesgos identificados
+            - Monitorear de cerca las condiciones de mercado
+            - Considerar seguros agrícolas
+            - Optimizar costos de producción
+            
+            **Recomendación**: Puede proceder pero implemente las medidas de gestión 
+            de riesgo sugeridas en el informe.
+            """
+        ),
+        (
+            "CONVIENE SEMBRAR ESTE CULTIVO",
+            "✅",
+            "#95E1D3",
+            """
+            **PROYECTO ALTAMENTE RECOMENDADO**
+            
+            El análisis integral indica que este proyecto agrícola presenta:
+            - Excelentes indicadores de rentabilidad
+            - Riesgos controlados y manejables
+            - Estabilidad favorable en diferentes escenarios
+            - Condiciones de mercado positivas
+            
+            **Recomendación**: Proceda con la implementación del proyecto siguiendo 
+            las mejores prácticas agronómicas identificadas.
+            """
+        )
+    )
+    
+    _ACCIONES = (
+        (
+            "Suspender el proyecto temporalmente",
+            "Evaluar cultivos alternativos completamente diferentes",
+            "Considerar asociarse con productores experimentados"
+        ),
+        (
+            "Reevaluar alternativas de cultivo para la región",
+            "Buscar asesoría técnica especializada",
+            "Realizar análisis de mercado más profundo"
+        ),
+        (
+            "Contratar seguro agrícola antes de iniciar",
+            "Implementar sistema de riego eficiente",
+            "Establecer plan de contingencia para riesgos identificados"
+        ),
+        (
+            "Iniciar preparación de terreno según cronograma",
+            "Asegurar disponibilidad de insumos de calidad",
+            "Establecer calendario de monitoreo fitosanitario"
+        )
+    )
+    
     def __init__(self):
         # Umbrales de decisión
         self.umbrales = {
@@ -25,7 +285,7 @@ class RecomendacionService:
     def calcular_puntuacion_proyecto(self,
                                     evaluacion_economica: Dict,
                                     analisis_riesgos: Dict,
-                                    resultados_escenarios: Dict) -> Dict:
+                                    resultados_escenarios: Dict) -> Puntuacion:
         """
         Calcula puntuación integral del proyecto.
         
@@ -35,8 +295,10 @@ class RecomendacionService:
             resultados_escenarios: Resultados de simulación de escenarios
             
         Returns:
-            Dict con puntuación detallada
+            Puntuacion con el detalle por criterio (usar to_dict() para serializar)
         """
+        volatilidad = _volatilidad_mercado(analisis_riesgos)
+        
         # 1. Criterio: Rentabilidad (40 puntos)
         puntos_rentabilidad = self._evaluar_rentabilidad(evaluacion_economica)
         
@@ -47,138 +309,156 @@ class RecomendacionService:
         puntos_escenarios = self._evaluar_escenarios(resultados_escenarios)
         
         # 4. Criterio: Condiciones de Mercado (10 puntos)
-        puntos_mercado = self._evaluar_mercado(evaluacion_economica, analisis_riesgos)
+        puntos_mercado = self._evaluar_mercado(evaluacion_economica, volatilidad)
         
         # Puntuación total
         puntuacion_total = (puntos_rentabilidad + puntos_riesgo + 
                           puntos_escenarios + puntos_mercado)
         
+        return Puntuacion(
+            puntuacion_total=puntuacion_total,
+            puntos_rentabilidad=puntos_rentabilidad,
+            puntos_riesgo=puntos_riesgo,
+            puntos_escenarios=puntos_escenarios,
+            puntos_mercado=puntos_mercado,
+            detalles=DetallesPuntuacion(
+                rentabilidad=self._detalle_rentabilidad(evaluacion_economica),
+                riesgo=self._detalle_riesgo(analisis_riesgos),
+                escenarios=self._detalle_escenarios(resultados_escenarios),
+                mercado=self._detalle_mercado(volatilidad)
+            )
+        )
+    
+    def calcular_puntuacion_batch(self,
+                                  van: np.ndarray,
+                                  roi: np.ndarray,
+                                  margen_utilidad: np.ndarray,
+                                  ira: np.ndarray,
+                                  van_pesimista: np.ndarray,
+                                  van_base: np.ndarray,
+                                  van_optimista: np.ndarray,
+                                  punto_equilibrio_kg: np.ndarray,
+                                  ingreso_total: np.ndarray,
+                                  volatilidad: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Calcula la puntuación de varios proyectos a la vez.
+        
+        Cada argumento es un array (o lista) con un valor por proyecto,
+        equivalente a los campos que leen los criterios de
+        calcular_puntuacion_proyecto.
+        
+        Args:
+            van: VAN de cada proyecto
+            roi: ROI de cada proyecto
+            margen_utilidad: Margen de utilidad de cada proyecto
+            ira: Índice de riesgo agregado de cada proyecto
+            van_pesimista: VAN en el escenario pesimista
+            van_base: VAN en el escenario base
+            van_optimista: VAN en el escenario optimista
+            punto_equilibrio_kg: Punto de equilibrio en kg
+            ingreso_total: Ingreso total esperado
+            volatilidad: Volatilidad del precio de mercado
+            
+        Returns:
+            Dict con arrays de puntuación total y por criterio
+        """
+        van_pesimista = np.asarray(van_pesimista, dtype=np.float64)
+        van_base = np.asarray(van_base, dtype=np.float64)
+        
+        # 1. Rentabilidad (40 puntos)
+        puntos_rentabilidad = (
+            np.where(np.asarray(van) > 0, 15, 0) +
+            _puntos_tramos(roi, _ROI_UMBRALES, _ROI_PUNTOS, side='left') +
+            _puntos_tramos(margen_utilidad, _MARGEN_UMBRALES, _MARGEN_PUNTOS, side='left')
+        )
+        
+        # 2. Riesgo (30 puntos)
+        puntos_riesgo = _puntos_tramos(ira, _IRA_UMBRALES, _IRA_PUNTOS)
+        
+        # 3. Estabilidad de escenarios (20 puntos)
+        dispersion = np.abs(np.asarray(van_optimista) - van_pesimista)
+        tramo_variabilidad = (dispersion[:, None] >=
+                              np.abs(van_base)[:, None] * _VARIABILIDAD_UMBRALES).sum(axis=1)
+        puntos_escenarios = (
+            _puntos_tramos(van_pesimista, _VAN_PESIMISTA_UMBRALES,
+                           _VAN_PESIMISTA_PUNTOS, side='left') +
+            np.where(van_base != 0, np.take(_VARIABILIDAD_PUNTOS, tramo_variabilidad), 0)
+        )
+        
+        # 4. Mercado (10 puntos): los umbrales del punto de equilibrio
+        # dependen de los ingresos de cada proyecto
+        menor = (np.asarray(punto_equilibrio_kg)[:, None] <
+                 np.asarray(ingreso_total)[:, None] * _PE_FACTORES)
+        tramo_pe = np.where(menor.any(axis=1), menor.argmax(axis=1), len(_PE_FACTORES))
+        puntos_mercado = (
+            np.take(_PE_PUNTOS, tramo_pe) +
+            _puntos_tramos(volatilidad, _VOLATILIDAD_UMBRALES, _VOLATILIDAD_PUNTOS)
+        )
+        
+        puntuacion_total = (puntos_rentabilidad + puntos_riesgo +
+                            puntos_escenarios + puntos_mercado)
+        
         return {
             'puntuacion_total': puntuacion_total,
             'puntos_rentabilidad': puntos_rentabilidad,
             'puntos_riesgo': puntos_riesgo,
             'puntos_escenarios': puntos_escenarios,
-            'puntos_mercado': puntos_mercado,
-            'porcentaje': round(puntuacion_total, 2),
-            'detalles': {
-                'rentabilidad': self._detalle_rentabilidad(evaluacion_economica),
-                'riesgo': self._detalle_riesgo(analisis_riesgos),
-                'escenarios': self._detalle_escenarios(resultados_escenarios),
-                'mercado': self._detalle_mercado(evaluacion_economica, analisis_riesgos)
-            }
+            'puntos_mercado': puntos_mercado
         }
     
     def _evaluar_rentabilidad(self, evaluacion: Dict) -> float:
         """Evalúa criterio de rentabilidad (máximo 40 puntos)"""
-        puntos = 0
-        
         # VAN positivo (15 puntos)
-        if evaluacion.get('van', 0) > 0:
-            puntos += 15
+        puntos = 15 if evaluacion.get('van', 0) > 0 else 0
         
         # ROI (15 puntos)
-        roi = evaluacion.get('roi', 0)
-        if roi > 50:
-            puntos += 15
-        elif roi > 30:
-            puntos += 12
-        elif roi > 20:
-            puntos += 10
-        elif roi > 10:
-            puntos += 7
-        elif roi > 0:
-            puntos += 5
+        puntos += _puntos_tramo(evaluacion.get('roi', 0),
+                                _ROI_UMBRALES, _ROI_PUNTOS, side='left')
         
         # Margen de utilidad (10 puntos)
-        margen = evaluacion.get('margen_utilidad', 0)
-        if margen > 30:
-            puntos += 10
-        elif margen > 20:
-            puntos += 8
-        elif margen > 15:
-            puntos += 7
-        elif margen > 10:
-            puntos += 5
-        elif margen > 0:
-            puntos += 3
+        puntos += _puntos_tramo(evaluacion.get('margen_utilidad', 0),
+                                _MARGEN_UMBRALES, _MARGEN_PUNTOS, side='left')
         
-        return min(puntos, 40)
+        return puntos
     
     def _evaluar_riesgo(self, analisis: Dict) -> float:
         """Evalúa criterio de riesgo (máximo 30 puntos)"""
-        ira = analisis.get('ira', 1.0)
-        
         # Puntuación inversa al riesgo
-        if ira < 0.33:
-            return 30
-        elif ira < 0.40:
-            return 25
-        elif ira < 0.50:
-            return 22
-        elif ira < 0.67:
-            return 15
-        elif ira < 0.80:
-            return 8
-        else:
-            return 0
+        return _puntos_tramo(analisis.get('ira', 1.0), _IRA_UMBRALES, _IRA_PUNTOS)
     
     def _evaluar_escenarios(self, escenarios: Dict) -> float:
         """Evalúa criterio de escenarios (máximo 20 puntos)"""
-        puntos = 0
-        
         # VAN positivo en escenario pesimista (10 puntos)
         van_pesimista = escenarios.get('Pesimista', {}).get('van', -999999)
-        if van_pesimista > 0:
-            puntos += 10
-        elif van_pesimista > -1000:
-            puntos += 5
+        puntos = _puntos_tramo(van_pesimista, _VAN_PESIMISTA_UMBRALES,
+                               _VAN_PESIMISTA_PUNTOS, side='left')
         
         # Estabilidad entre escenarios (10 puntos)
         van_base = escenarios.get('Base', {}).get('van', 0)
         van_optimista = escenarios.get('Optimista', {}).get('van', 0)
         
+        # Variabilidad = dispersión / |VAN base|, comparada sin dividir
+        # escalando los umbrales por |VAN base|
         if van_base != 0:
-            variabilidad = abs(van_optimista - van_pesimista) / abs(van_base)
-            
-            if variabilidad < 1.0:
-                puntos += 10
-            elif variabilidad < 1.5:
-                puntos += 8
-            elif variabilidad < 2.0:
-                puntos += 6
-            else:
-                puntos += 2
+            puntos += _puntos_tramo(abs(van_optimista - van_pesimista),
+                                    tuple(abs(van_base) * u for u in _VARIABILIDAD_UMBRALES),
+                                    _VARIABILIDAD_PUNTOS)
         
-        return min(puntos, 20)
+        return puntos
     
-    def _evaluar_mercado(self, evaluacion: Dict, riesgos: Dict) -> float:
+    def _evaluar_mercado(self, evaluacion: Dict, volatilidad: float) -> float:
         """Evalúa criterio de mercado (máximo 10 puntos)"""
-        puntos = 0
-        
         # Punto de equilibrio alcanzable (5 puntos)
         pe_kg = evaluacion.get('punto_equilibrio_kg', 999999)
         ingresos = evaluacion.get('ingreso_total', 0)
-        
-        if pe_kg < ingresos * 0.5:
-            puntos += 5
-        elif pe_kg < ingresos * 0.7:
-            puntos += 3
-        elif pe_kg < ingresos * 0.9:
-            puntos += 1
+        umbrales_pe = tuple(ingresos * f for f in _PE_FACTORES)
+        puntos = _PE_PUNTOS[_tramo_primer_menor(pe_kg, umbrales_pe)]
         
         # Volatilidad de precios (5 puntos)
-        riesgo_mercado = riesgos.get('componentes', {}).get('mercado', {}).get('volatilidad', 0.5)
-        
-        if riesgo_mercado < 0.20:
-            puntos += 5
-        elif riesgo_mercado < 0.30:
-            puntos += 4
-        elif riesgo_mercado < 0.40:
-            puntos += 2
-        else:
-            puntos += 1
+        puntos += _puntos_tramo(volatilidad, _VOLATILIDAD_UMBRALES,
+                                _VOLATILIDAD_PUNTOS)
         
-        return min(puntos, 10)
+        return puntos
     
     def _detalle_rentabilidad(self, evaluacion: Dict) -> str:
         """Genera detalle de evaluación de rentabilidad"""
@@ -186,127 +466,41 @@ class RecomendacionService:
         roi = evaluacion.get('roi', 0)
         margen = evaluacion.get('margen_utilidad', 0)
         
-        if van > 0 and roi > 30 and margen > 20:
-            return "Excelente rentabilidad en todos los indicadores"
-        elif van > 0 and roi > 15:
-            return "Rentabilidad satisfactoria"
-        elif van > 0:
-            return "Rentabilidad positiva pero ajustada"
-        else:
-            return "Rentabilidad insuficiente"
+        positivo = van > 0
+        indice = (int(positivo) + int(positivo and roi > 15) +
+                  int(positivo and roi > 30 and margen > 20))
+        return _DETALLES_RENTABILIDAD[indice]
     
     def _detalle_riesgo(self, analisis: Dict) -> str:
         """Genera detalle de evaluación de riesgo"""
-        categoria = analisis.get('categoria', 'ALTO')
-        
-        if categoria == 'BAJO':
-            return "Nivel de riesgo bajo y manejable"
-        elif categoria == 'MEDIO':
-            return "Nivel de riesgo moderado, requiere monitoreo"
-        else:
-            return "Nivel de riesgo alto, se requieren medidas de mitigación"
+        return _DETALLES_RIESGO.get(analisis.get('categoria', 'ALTO'), _DETALLE_RIESGO_ALTO)
     
     def _detalle_escenarios(self, escenarios: Dict) -> str:
         """Genera detalle de evaluación de escenarios"""
         van_pes = escenarios.get('Pesimista', {}).get('van', 0)
-        
-        if van_pes > 0:
-            return "Proyecto viable incluso en escenario pesimista"
-        elif van_pes > -5000:
-            return "Vulnerabilidad moderada en escenario pesimista"
-        else:
-            return "Alta vulnerabilidad en condiciones adversas"
+        return _DETALLES_ESCENARIOS[int(van_pes > -5000) + int(van_pes > 0)]
     
-    def _detalle_mercado(self, evaluacion: Dict, riesgos: Dict) -> str:
+    def _detalle_mercado(self, volatilidad: float) -> str:
         """Genera detalle de evaluación de mercado"""
-        volatilidad = riesgos.get('componentes', {}).get('mercado', {}).get('volatilidad', 0.5)
-        
-        if volatilidad < 0.25:
-            return "Mercado estable con baja volatilidad"
-        elif volatilidad < 0.40:
-            return "Volatilidad de precios moderada"
-        else:
-            return "Alta volatilidad de precios, considerar estrategias de cobertura"
+        return _DETALLES_MERCADO[int(volatilidad >= 0.25) + int(volatilidad >= 0.40)]
     
     def generar_recomendacion_final(self, puntuacion: Dict) -> Dict:
         """
         Genera la recomendación final del sistema.
         
         Args:
-            puntuacion: Dict con puntuación calculada
+            puntuacion: Puntuacion (o dict equivalente) calculada
             
         Returns:
             Dict con recomendación final
         """
         puntaje = puntuacion['puntuacion_total']
         
-        if puntaje >= self.umbrales['puntuacion_excelente']:
-            recomendacion = "CONVIENE SEMBRAR ESTE CULTIVO"
-            emoji = "✅"
-            color = "#95E1D3"
-            detalle = """
-            **PROYECTO ALTAMENTE RECOMENDADO**
-            
-            El análisis integral indica que este proyecto agrícola presenta:
-            - Excelentes indicadores de rentabilidad
-            - Riesgos controlados y manejables
-            - Estabilidad favorable en diferentes escenarios
-            - Condiciones de mercado positivas
-            
-            **Recomendación**: Proceda con la implementación del proyecto siguiendo 
-            las mejores prácticas agronómicas identificadas.
-            """
-        
-        elif puntaje >= self.umbrales['puntuacion_buena']:
-            recomendacion = "CONVIENE SEMBRAR CON PRECAUCIONES"
-            emoji = "⚠️"
-            color = "#FFD93D"
-            detalle = """
-            **PROYECTO VIABLE CON CONSIDERACIONES**
-            
-            El proyecto es viable pero requiere atención a:
-            - Implementar medidas de mitigación de riesgos identificados
-            - Monitorear de cerca las condiciones de mercado
-            - Considerar seguros agrícolas
-            - Optimizar costos de producción
-            
-            **Recomendación**: Puede proceder pero implemente las medidas de gestión 
-            de riesgo sugeridas en el informe.
-            """
-        
-        elif puntaje >= self.umbrales['puntuacion_regular']:
-            recomendacion = "SE RECOMIENDA ROTAR O AJUSTAR CULTIVO"
-            emoji = "🔄"
-            color = "#FFA500"
-            detalle = """
-            **PROYECTO CON RIESGOS SIGNIFICATIVOS**
-            
-            El análisis sugiere considerar:
-            - Evaluar cultivos alternativos más rentables para la región
-            - Reducir costos de producción mediante optimización
-            - Mejorar tecnología y prácticas agronómicas
-            - Buscar mercados con mejores condiciones de precio
-            
-            **Recomendación**: Considere ajustar el plan antes de proceder o evalúe 
-            alternativas de cultivo más adecuadas.
-            """
-        
-        else:
-            recomendacion = "NO SE RECOMIENDA SEMBRAR EN ESTA CAMPAÑA"
-            emoji = "❌"
-            color = "#FF6B6B"
-            detalle = """
-            **PROYECTO NO RECOMENDADO**
-            
-            El análisis indica riesgos y condiciones desfavorables:
-            - Rentabilidad insuficiente o negativa
-            - Riesgos elevados no mitigables en el corto plazo
-            - Condiciones de mercado adversas
-            - Vulnerabilidad alta ante cambios
-            
-            **Recomendación**: NO proceda con este proyecto. Evalúe alternativas 
-            completamente diferentes o espere condiciones más favorables en futuras campañas.
-            """
+        # Tramo 0-3: cantidad de umbrales (regular, buena, excelente) alcanzados
+        tramo = bisect_right((self.umbrales['puntuacion_regular'],
+                              self.umbrales['puntuacion_buena'],
+                              self.umbrales['puntuacion_excelente']), puntaje)
+        recomendacion, emoji, color, detalle = self._RECOMENDACIONES[tramo]
         
         return {
             'recomendacion': recomendacion,
@@ -314,67 +508,29 @@ class RecomendacionService:
             'color': color,
             'detalle': detalle,
             'nivel_confianza': self._calcular_nivel_confianza(puntuacion),
-            'acciones_inmediatas': self._generar_acciones_inmediatas(
-                puntaje, puntuacion
-            )
+            'acciones_inmediatas': self._generar_acciones_inmediatas(tramo)
         }
     
     def _calcular_nivel_confianza(self, puntuacion: Dict) -> str:
         """Calcula el nivel de confianza de la recomendación"""
         # Basado en la distribución de puntos
-        puntos = [
+        puntos = np.array([
             puntuacion['puntos_rentabilidad'],
             puntuacion['puntos_riesgo'],
             puntuacion['puntos_escenarios'],
             puntuacion['puntos_mercado']
-        ]
+        ], dtype=np.float64)
         
-        maximos = [40, 30, 20, 10]
-        porcentajes = [p/m*100 for p, m in zip(puntos, maximos)]
+        porcentajes = puntos / _MAXIMOS_CRITERIO * 100
         
         # Si todos los criterios están balanceados, mayor confianza
-        desviacion = max(porcentajes) - min(porcentajes)
+        desviacion = np.ptp(porcentajes)
         
-        if desviacion < 20:
-            return "Muy Alta"
-        elif desviacion < 40:
-            return "Alta"
-        elif desviacion < 60:
-            return "Media"
-        else:
-            return "Baja (criterios desbalanceados)"
+        return _NIVELES_CONFIANZA[bisect_right(_DESVIACION_UMBRALES, desviacion)]
     
-    def _generar_acciones_inmediatas(self, puntaje: float, 
-                                     puntuacion: Dict) -> List[str]:
-        """Genera lista de acciones inmediatas"""
-        acciones = []
-        
-        if puntaje >= 80:
-            acciones.extend([
-                "Iniciar preparación de terreno según cronograma",
-                "Asegurar disponibilidad de insumos de calidad",
-                "Establecer calendario de monitoreo fitosanitario"
-            ])
-        elif puntaje >= 60:
-            acciones.extend([
-                "Contratar seguro agrícola antes de iniciar",
-                "Implementar sistema de riego eficiente",
-                "Establecer plan de contingencia para riesgos identificados"
-            ])
-        elif puntaje >= 40:
-            acciones.extend([
-                "Reevaluar alternativas de cultivo para la región",
-                "Buscar asesoría técnica especializada",
-                "Realizar análisis de mercado más profundo"
-            ])
-        else:
-            acciones.extend([
-                "Suspender el proyecto temporalmente",
-                "Evaluar cultivos alternativos completamente diferentes",
-                "Considerar asociarse con productores experimentados"
-            ])
-        
-        return acciones
+    def _generar_acciones_inmediatas(self, tramo: int) -> List[str]:
+        """Genera lista de acciones inmediatas para el tramo de puntaje"""
+        return list(self._ACCIONES[tramo])
 
 
 def generar_recomendacion_rapida(van: float, roi: float, ira: float) -> str:
@@ -389,9 +545,6 @@ def generar_recomendacion_rapida(van: float, roi: float, ira: float) -> str:
     Returns:
         String con recomendación
     """
-    if van > 0 and roi > 20 and ira < 0.5:
-        return "RECOMENDADO"
-    elif van > 0 and roi > 10:
-        return "VIABLE CON PRECAUCIONES"
-    else:
-        return "NO RECOMENDADO"
\ No newline at end of file
+    indice = (6 * int(van > 0) + 2 * bisect_left(_ROI_RAPIDO_UMBRALES, roi) +
+              int(ira < 0.5))
+    return _RECOMENDACION_RAPIDA[indice]
\ No newline at end of file
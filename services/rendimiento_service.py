@@ -4,26 +4,102 @@ Servicio de Predicción de Rendimiento
 Capa de servicio que integra el modelo de rendimiento con la lógica de negocio.
 """
 
-import sys
-sys.path.append('.')
-
 from models.rendimiento_model import RendimientoModel, predecir_rendimiento_rapido
-from typing import Dict, Tuple
-import pandas as pd
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Tuple
 import numpy as np
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+@dataclass(slots=True, frozen=True)
+class PrediccionRendimiento:
+    """Resultado inmutable de una predicción completa de rendimiento"""
+    rendimiento_minimo: float
+    rendimiento_probable: float
+    rendimiento_maximo: float
+    produccion_minima: float
+    produccion_probable: float
+    produccion_maxima: float
+    factor_ajuste: float
+    factor_region: float
+    parametros: Tuple[Tuple[str, float], ...]
+    recomendaciones: Tuple[str, ...]
+    area_disponible: float
+    
+    def __getitem__(self, clave: str):
+        """Acceso por clave, compatible con el antiguo resultado en dict"""
+        valor = getattr(self, clave)
+        if clave == 'parametros':
+            return dict(valor)
+        if clave == 'recomendaciones':
+            return list(valor)
+        return valor
+    
+    def to_dict(self) -> Dict:
+        """Convierte la predicción al formato dict anterior"""
+        return {
+            'rendimiento_minimo': self.rendimiento_minimo,
+            'rendimiento_probable': self.rendimiento_probable,
+            'rendimiento_maximo': self.rendimiento_maximo,
+            'produccion_minima': self.produccion_minima,
+            'produccion_probable': self.produccion_probable,
+            'produccion_maxima': self.produccion_maxima,
+            'factor_ajuste': self.factor_ajuste,
+            'factor_region': self.factor_region,
+            'parametros': dict(self.parametros),
+            'recomendaciones': list(self.recomendaciones),
+            'area_disponible': self.area_disponible
+        }
+
 
 class RendimientoService:
     """Servicio para gestionar predicciones de rendimiento"""
     
     def __init__(self):
         self.modelo = RendimientoModel()
+        
+        # Factores regionales como array denso para obtener_factores_region;
+        # la última posición guarda el factor por defecto (0.9) para regiones
+        # no registradas (índice -1)
+        self._indice_region = {r: i for i, r in enumerate(self.modelo.factores_region)}
+        self._factores_region = np.append(
+            np.fromiter(self.modelo.factores_region.values(), dtype=np.float64,
+                        count=len(self.modelo.factores_region)),
+            0.9
+        )
+        
+        # Caché por instancia de las predicciones del modelo
+        self._prediccion_base = lru_cache(maxsize=256)(self._calcular_prediccion_base)
+    
+    def _calcular_prediccion_base(self,
+                                  cultivo: str,
+                                  region: str,
+                                  fertilidad_suelo: float,
+                                  disponibilidad_agua: float,
+                                  tecnologia: float,
+                                  experiencia: float) -> Tuple[float, float, float, float]:
+        """Rendimientos (mínimo, probable, máximo) y factor de ajuste del modelo"""
+        rend_min, rend_prob, rend_max = self.modelo.predecir_rendimiento(
+            cultivo=cultivo,
+            region=region,
+            fertilidad_suelo=fertilidad_suelo,
+            disponibilidad_agua=disponibilidad_agua,
+            tecnologia=tecnologia,
+            experiencia=experiencia
+        )
+        factor_ajuste = self.modelo.calcular_factor_ajuste(
+            fertilidad_suelo, disponibilidad_agua, tecnologia, experiencia
+        )
+        return rend_min, rend_prob, rend_max, factor_ajuste
     
     def predecir_rendimiento_completo(self,
                                      cultivo: str,
                                      region: str,
                                      area_disponible: float,
-                                     parametros: Dict) -> Dict:
+                                     parametros: Dict) -> PrediccionRendimiento:
         """
         Realiza una predicción completa de rendimiento incluyendo producción total.
         
@@ -34,16 +110,16 @@ class RendimientoService:
             parametros: Dict con fertilidad_suelo, disponibilidad_agua, tecnologia, experiencia
             
         Returns:
-            Dict con todos los resultados de predicción
+            PrediccionRendimiento con todos los resultados (usar to_dict() para serializar)
         """
-        # Predicción de rendimiento por hectárea
-        rend_min, rend_prob, rend_max = self.modelo.predecir_rendimiento(
-            cultivo=cultivo,
-            region=region,
-            fertilidad_suelo=parametros.get('fertilidad_suelo', 7),
-            disponibilidad_agua=parametros.get('disponibilidad_agua', 7),
-            tecnologia=parametros.get('tecnologia', 6),
-            experiencia=parametros.get('experiencia', 10)
+        # Predicción de rendimiento por hectárea y factor de ajuste (en caché)
+        rend_min, rend_prob, rend_max, factor_ajuste = self._prediccion_base(
+            cultivo,
+            region,
+            parametros.get('fertilidad_suelo', 7),
+            parametros.get('disponibilidad_agua', 7),
+            parametros.get('tecnologia', 6),
+            parametros.get('experiencia', 10)
         )
         
         # Calcular producción total
@@ -56,33 +132,39 @@ class RendimientoService:
             cultivo, region, rend_prob
         )
         
-        # Factor de ajuste calculado
-        factor_ajuste = self.modelo.calcular_factor_ajuste(
-            parametros.get('fertilidad_suelo', 7),
-            parametros.get('disponibilidad_agua', 7),
-            parametros.get('tecnologia', 6),
-            parametros.get('experiencia', 10)
+        return PrediccionRendimiento(
+            rendimiento_minimo=round(rend_min, 2),
+            rendimiento_probable=round(rend_prob, 2),
+            rendimiento_maximo=round(rend_max, 2),
+            produccion_minima=round(prod_min, 2),
+            produccion_probable=round(prod_prob, 2),
+            produccion_maxima=round(prod_max, 2),
+            factor_ajuste=round(factor_ajuste, 3),
+            factor_region=self.modelo.factores_region.get(region, 0.9),
+            parametros=tuple(parametros.items()),
+            recomendaciones=tuple(recomendaciones),
+            area_disponible=area_disponible
         )
+    
+    def obtener_factores_region(self, regiones: List[str]) -> np.ndarray:
+        """
+        Obtiene el factor de ajuste de varias regiones a la vez.
         
-        return {
-            'rendimiento_minimo': round(rend_min, 2),
-            'rendimiento_probable': round(rend_prob, 2),
-            'rendimiento_maximo': round(rend_max, 2),
-            'produccion_minima': round(prod_min, 2),
-            'produccion_probable': round(prod_prob, 2),
-            'produccion_maxima': round(prod_max, 2),
-            'factor_ajuste': round(factor_ajuste, 3),
-            'factor_region': self.modelo.factores_region.get(region, 0.9),
-            'parametros': parametros,
-            'recomendaciones': recomendaciones,
-            'area_disponible': area_disponible
-        }
+        Args:
+            regiones: Lista de nombres de regiones
+            
+        Returns:
+            Array con el factor de cada región (0.9 si no está registrada)
+        """
+        indices = np.fromiter((self._indice_region.get(r, -1) for r in regiones),
+                              dtype=np.intp, count=len(regiones))
+        return self._factores_region[indices]
     
     def comparar_cultivos(self,
                          cultivos: list,
                          region: str,
                          area_disponible: float,
-                         parametros: Dict) -> pd.DataFrame:
+                         parametros: Dict) -> 'pd.DataFrame':
         """
         Compara múltiples cultivos para la misma región y condiciones.
         
@@ -95,25 +177,38 @@ class RendimientoService:
         Returns:
             DataFrame con comparación de cultivos
         """
-        resultados = []
+        # pandas solo se carga cuando se compara cultivos
+        import pandas as pd
         
-        for cultivo in cultivos:
+        n = len(cultivos)
+        rendimientos = np.empty((n, 3))
+        validos = np.zeros(n, dtype=bool)
+        
+        fertilidad = parametros.get('fertilidad_suelo', 7)
+        agua = parametros.get('disponibilidad_agua', 7)
+        tecnologia = parametros.get('tecnologia', 6)
+        experiencia = parametros.get('experiencia', 10)
+        
+        # Solo se necesita la predicción del modelo (sin recomendaciones)
+        for i, cultivo in enumerate(cultivos):
             try:
-                prediccion = self.predecir_rendimiento_completo(
-                    cultivo, region, area_disponible, parametros
-                )
-                
-                resultados.append({
-                    'Cultivo': cultivo,
-                    'Rendimiento (kg/ha)': prediccion['rendimiento_probable'],
-                    'Producción Total (kg)': prediccion['produccion_probable'],
-                    'Rend. Mínimo (kg/ha)': prediccion['rendimiento_minimo'],
-                    'Rend. Máximo (kg/ha)': prediccion['rendimiento_maximo']
-                })
-            except:
+                rendimientos[i] = self._prediccion_base(
+                    cultivo, region, fertilidad, agua, tecnologia, experiencia
+                )[:3]
+            except (KeyError, ValueError):
+                # Cultivo inexistente o sin datos de rendimiento
                 continue
+            validos[i] = True
+        
+        rendimientos = rendimientos[validos]
         
-        return pd.DataFrame(resultados)
+        return pd.DataFrame({
+            'Cultivo': [c for c, valido in zip(cultivos, validos) if valido],
+            'Rendimiento (kg/ha)': np.round(rendimientos[:, 1], 2),
+            'Producción Total (kg)': np.round(rendimientos[:, 1] * area_disponible, 2),
+            'Rend. Mínimo (kg/ha)': np.round(rendimientos[:, 0], 2),
+            'Rend. Máximo (kg/ha)': np.round(rendimientos[:, 2], 2)
+        })
     
     def calcular_brecha_productiva(self,
                                    cultivo: str,
@@ -160,7 +255,13 @@ class RendimientoService:
         }
 
 
-def obtener_prediccion_simple(cultivo: str, region: str, area: float) -> Dict:
+@lru_cache(maxsize=1)
+def _servicio_default() -> RendimientoService:
+    """Instancia compartida del servicio (el modelo se carga una sola vez)"""
+    return RendimientoService()
+
+
+def obtener_prediccion_simple(cultivo: str, region: str, area: float) -> PrediccionRendimiento:
     """
     Función auxiliar para obtener predicción rápida con parámetros por defecto.
     
@@ -170,9 +271,9 @@ def obtener_prediccion_simple(cultivo: str, region: str, area: float) -> Dict:
         area: Área en hectáreas
         
     Returns:
-        Dict con predicción
+        PrediccionRendimiento con la predicción
     """
-    servicio = RendimientoService()
+    servicio = _servicio_default()
     parametros = {
         'fertilidad_suelo': 7,
         'disponibilidad_agua': 7,
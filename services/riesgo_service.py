@@ -8,15 +8,114 @@ import sys
 sys.path.append('.')
 
 from models.riesgo_model import RiesgoModel, calcular_ira_rapido
+from bisect import bisect_right
+from copy import deepcopy
+from functools import lru_cache
 from typing import Dict, List
+import re
+import numpy as np
 import pandas as pd
 
+try:
+    import ahocorasick
+    _AHOCORASICK_AVAILABLE = True
+except ImportError:  # pyahocorasick es opcional
+    _AHOCORASICK_AVAILABLE = False
+
+
+# Factores de reducción por tipo de medida, en orden de prioridad: si una
+# medida menciona varios tipos, cuenta el primero de esta tabla
+_FACTORES_REDUCCION = {
+    'seguro': 0.15,
+    'riego': 0.12,
+    'tecnologia': 0.10,
+    'diversificacion': 0.08,
+    'capacitacion': 0.06,
+    'monitoreo': 0.05
+}
+
+
+def _crear_buscador_medidas():
+    """
+    Construye un buscador de tipos de medida que recorre el texto una sola vez.
+    
+    Returns:
+        Función que recibe el texto en minúsculas y devuelve la tupla
+        (prioridad, clave, factor) del tipo encontrado, o None
+    """
+    if _AHOCORASICK_AVAILABLE:
+        automata = ahocorasick.Automaton()
+        for prioridad, (clave, factor) in enumerate(_FACTORES_REDUCCION.items()):
+            automata.add_word(clave, (prioridad, clave, factor))
+        automata.make_automaton()
+        
+        def buscar(texto: str):
+            return min((valor for _, valor in automata.iter(texto)), default=None)
+    else:
+        # La búsqueda anticipada permite coincidencias solapadas
+        patron = re.compile('(?=(' + '|'.join(map(re.escape, _FACTORES_REDUCCION)) + '))')
+        prioridades = {
+            clave: (prioridad, clave, factor)
+            for prioridad, (clave, factor) in enumerate(_FACTORES_REDUCCION.items())
+        }
+        
+        def buscar(texto: str):
+            return min((prioridades[m.group(1)] for m in patron.finditer(texto)), default=None)
+    
+    return buscar
+
+
+_buscar_medida = _crear_buscador_medidas()
+
+# Tramos del IRA (cada umbral es el inicio del tramo siguiente)
+_UMBRALES_ATENCION = (0.33, 0.5, 0.67)
+_NIVELES_ATENCION = (
+    "Monitoreo rutinario",
+    "Atención moderada",
+    "Atención elevada",
+    "Atención crítica"
+)
+_UMBRALES_IRA = (0.33, 0.67)
+_CATEGORIAS_IRA = ("BAJO", "MEDIO", "ALTO")
+
 
 class RiesgoService:
     """Servicio para análisis integral de riesgos"""
     
     def __init__(self):
         self.modelo = RiesgoModel()
+        # Caché por instancia de los análisis (el cálculo es puro dados sus argumentos)
+        self._analisis_base = lru_cache(maxsize=256)(self._calcular_analisis_base)
+    
+    def _calcular_analisis_base(self,
+                                region: str,
+                                cultivo: str,
+                                rendimiento_minimo: float,
+                                rendimiento_probable: float,
+                                rendimiento_maximo: float,
+                                precio_esperado: float,
+                                mes_siembra: int) -> Dict:
+        """Análisis de riesgos completo para argumentos escalares (cacheable)"""
+        resultado_ira = self.modelo.calcular_ira(
+            region=region,
+            cultivo=cultivo,
+            rendimiento_minimo=rendimiento_minimo,
+            rendimiento_probable=rendimiento_probable,
+            rendimiento_maximo=rendimiento_maximo,
+            precio_esperado=precio_esperado,
+            mes_siembra=mes_siembra
+        )
+        
+        # Agregar análisis adicional
+        resultado_ira['nivel_atencion'] = self._determinar_nivel_atencion(
+            resultado_ira['ira']
+        )
+        
+        resultado_ira['acciones_prioritarias'] = self._generar_acciones_prioritarias(
+            resultado_ira['componentes']
+        )
+        
+        return resultado_ira
     
     def analizar_riesgos_completo(self,
                                  region: str,
@@ -37,37 +136,23 @@ class RiesgoService:
         Returns:
             Dict con análisis completo de riesgos
         """
-        resultado_ira = self.modelo.calcular_ira(
-            region=region,
-            cultivo=cultivo,
-            rendimiento_minimo=prediccion_rendimiento['rendimiento_minimo'],
-            rendimiento_probable=prediccion_rendimiento['rendimiento_probable'],
-            rendimiento_maximo=prediccion_rendimiento['rendimiento_maximo'],
-            precio_esperado=precio_esperado,
-            mes_siembra=mes_siembra
-        )
-        
-        # Agregar análisis adicional
-        resultado_ira['nivel_atencion'] = self._determinar_nivel_atencion(
-            resultado_ira['ira']
+        resultado = self._analisis_base(
+            region,
+            cultivo,
+            prediccion_rendimiento['rendimiento_minimo'],
+            prediccion_rendimiento['rendimiento_probable'],
+            prediccion_rendimiento['rendimiento_maximo'],
+            precio_esperado,
+            mes_siembra
         )
         
-        resultado_ira['acciones_prioritarias'] = self._generar_acciones_prioritarias(
-            resultado_ira['componentes']
-        )
-        
-        return resultado_ira
+        # Copia para que el llamador pueda modificar el resultado sin
+        # alterar la entrada en caché
+        return deepcopy(resultado)
     
     def _determinar_nivel_atencion(self, ira: float) -> str:
         """Determina el nivel de atención requerido"""
-        if ira < 0.33:
-            return "Monitoreo rutinario"
-        elif ira < 0.5:
-            return "Atención moderada"
-        elif ira < 0.67:
-            return "Atención elevada"
-        else:
-            return "Atención crítica"
+        return _NIVELES_ATENCION[bisect_right(_UMBRALES_ATENCION, ira)]
     
     def _generar_acciones_prioritarias(self, componentes: Dict) -> List[str]:
         """Genera acciones prioritarias según componentes de riesgo"""
@@ -103,29 +188,18 @@ class RiesgoService:
         Returns:
             Dict con estimación de reducción de riesgo
         """
-        # Factores de reducción por tipo de medida
-        factores_reduccion = {
-            'seguro': 0.15,
-            'riego': 0.12,
-            'tecnologia': 0.10,
-            'diversificacion': 0.08,
-            'capacitacion': 0.06,
-            'monitoreo': 0.05
-        }
-        
         reduccion_total = 0
         medidas_efectivas = []
         
         for medida in medidas_propuestas:
-            medida_lower = medida.lower()
-            for clave, factor in factores_reduccion.items():
-                if clave in medida_lower:
-                    reduccion_total += factor
-                    medidas_efectivas.append({
-                        'medida': medida,
-                        'reduccion_estimada': factor
-                    })
-                    break
+            encontrada = _buscar_medida(medida.lower())
+            if encontrada is not None:
+                factor = encontrada[2]
+                reduccion_total += factor
+                medidas_efectivas.append({
+                    'medida': medida,
+                    'reduccion_estimada': factor
+                })
         
         # Limitar reducción máxima al 35%
         reduccion_total = min(reduccion_total, 0.35)
@@ -142,12 +216,7 @@ class RiesgoService:
     
     def _categorizar_ira(self, ira: float) -> str:
         """Categoriza el IRA"""
-        if ira < 0.33:
-            return "BAJO"
-        elif ira < 0.67:
-            return "MEDIO"
-        else:
-            return "ALTO"
+        return _CATEGORIAS_IRA[bisect_right(_UMBRALES_IRA, ira)]
     
     def comparar_riesgos_regiones(self,
                                  cultivo: str,
@@ -164,32 +233,27 @@ class RiesgoService:
         Returns:
             DataFrame con comparación de riesgos
         """
-        resultados = []
-        
-        for region in regiones:
-            try:
-                analisis = self.analizar_riesgos_completo(
-                    region=region,
-                    cultivo=cultivo,
-                    prediccion_rendimiento=prediccion_rendimiento
-                )
-                
-                resultados.append({
-                    'Región': region,
-                    'IRA': analisis['ira'],
-                    'Categoría': analisis['categoria'],
-                    'Riesgo Climático': analisis['componentes']['climatico']['riesgo_total'],
-                    'Riesgo Mercado': analisis['componentes']['mercado']['riesgo_ajustado'],
-                    'Riesgo Producción': analisis['componentes']['produccion']['riesgo']
-                })
-            except:
-                continue
+        resultado = self.modelo.calcular_ira_batch(
+            regiones=regiones,
+            cultivo=cultivo,
+            rendimiento_minimo=prediccion_rendimiento['rendimiento_minimo'],
+            rendimiento_probable=prediccion_rendimiento['rendimiento_probable'],
+            rendimiento_maximo=prediccion_rendimiento['rendimiento_maximo']
+        )
         
-        df = pd.DataFrame(resultados)
-        if not df.empty:
-            df = df.sort_values('IRA')
+        # Ordenar por IRA conservando como índice la posición original de cada región
+        orden = np.argsort(resultado['ira'], kind='stable')
         
-        return df
+        return pd.DataFrame({
+            'Región': np.asarray(regiones, dtype=object)[orden],
+            'IRA': resultado['ira'][orden],
+            # Categoría calculada por el modelo con sus propios umbrales
+            'Categoría': pd.Categorical(resultado['categoria'][orden],
+                                        categories=_CATEGORIAS_IRA, ordered=True),
+            'Riesgo Climático': resultado['climatico'][orden],
+            'Riesgo Mercado': resultado['mercado'][orden],
+            'Riesgo Producción': resultado['produccion'][orden]
+        }, index=orden, copy=False)
     
     def generar_mapa_calor_riesgos(self,
                                    componentes: Dict) -> pd.DataFrame:
@@ -230,6 +294,12 @@ class RiesgoService:
         return pd.DataFrame(datos)
 
 
+@lru_cache(maxsize=1)
+def _servicio_default() -> RiesgoService:
+    """Instancia compartida del servicio (el modelo se carga una sola vez)"""
+    return RiesgoService()
+
+
 def calcular_riesgo_simple(region: str, cultivo: str,
                           rendimiento_probable: float) -> Dict:
     """
@@ -243,7 +313,7 @@ def calcular_riesgo_simple(region: str, cultivo: str,
     Returns:
         Dict con análisis de riesgo
     """
-    servicio = RiesgoService()
+    servicio = _servicio_default()
     prediccion = {
         'rendimiento_minimo': rendimiento_probable * 0.7,
         'rendimiento_probable': rendimiento_probable,
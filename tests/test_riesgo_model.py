@@ -0,0 +1,51 @@
+"""
+Pruebas del modelo de riesgos
+=============================
+Verifica que el cálculo en lote del IRA coincida con el cálculo por región.
+"""
+
+import unittest
+
+from models.riesgo_model import RiesgoModel
+
+
+class TestCalcularIraBatch(unittest.TestCase):
+    """Compara calcular_ira_batch con calcular_ira"""
+    
+    def setUp(self):
+        self.modelo = RiesgoModel()
+        self.regiones = ['Lambayeque', 'Lima', 'Piura', 'Región Inexistente']
+    
+    def test_categoria_justo_debajo_del_umbral(self):
+        """Un IRA apenas menor que un umbral no debe subir de categoría"""
+        pesos = self.modelo.pesos_ira
+        umbrales = (self.modelo.umbrales['bajo'], self.modelo.umbrales['medio'])
+        casos_frontera = 0
+        
+        # Recorre el riesgo de producción de 0 a 0.8 en pasos de 0.0011
+        for paso in range(0, 8001, 11):
+            rendimiento_minimo = 1000 - paso * 0.2
+            lote = self.modelo.calcular_ira_batch(
+                self.regiones, 'Inexistente', rendimiento_minimo, 1000, 1000
+            )
+            
+            for i, region in enumerate(self.regiones):
+                resultado = self.modelo.calcular_ira(
+                    region, 'Inexistente', rendimiento_minimo, 1000, 1000
+                )
+                componentes = resultado['componentes']
+                ira = (componentes['climatico']['riesgo_total'] * pesos['climatico'] +
+                       componentes['mercado']['riesgo_ajustado'] * pesos['mercado'] +
+                       componentes['produccion']['riesgo'] * pesos['produccion'])
+                if any(umbral - 5e-5 <= ira < umbral for umbral in umbrales):
+                    casos_frontera += 1
+                
+                self.assertEqual(lote['categoria'][i], resultado['categoria'],
+                                 f"{region}, rendimiento mínimo {rendimiento_minimo}")
+                self.assertEqual(lote['ira'][i], resultado['ira'])
+        
+        self.assertGreater(casos_frontera, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
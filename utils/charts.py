@@ -2,18 +2,79 @@
 Utilidades para Gráficos
 =========================
 Funciones para crear visualizaciones con Plotly.
+
+Las figuras no se guardan en st.cache_data: cada acierto deserializa la
+Figure, lo que vuelve a validar todo el layout y cuesta más que construirla.
 """
 
-import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Dict, Optional
 import numpy as np
-from typing import List, Dict, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import plotly.graph_objects as go
+
+
+# Máximo de períodos que se envían al navegador en un gráfico de flujo
+_MAX_PUNTOS_FLUJO = 5000
+
+# Plantilla de Plotly que usan todos los gráficos del módulo
+_PLANTILLA = 'agroshield'
+
+# Paleta de colores para gráficos con varias categorías
+_PALETA = ('#FF6B6B', '#4ECDC4', '#95E1D3', '#FFD93D',
+           '#6C5CE7', '#A29BFE', '#FD79A8', '#FDCB6E')
+
+
+def _registrar_plantilla(nombre: str, base: str, **layout) -> None:
+    """Registra en Plotly una copia de la plantilla base con ajustes de layout"""
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    
+    plantilla = go.layout.Template(pio.templates[base])
+    plantilla.layout.update(layout)
+    pio.templates[nombre] = plantilla
+
+
+@lru_cache(maxsize=1)
+def _plotly():
+    """
+    Importa Plotly al crear el primer gráfico (no al cargar el módulo).
+    
+    Returns:
+        Módulo plotly.graph_objects, con las plantillas del módulo registradas
+    """
+    import plotly.graph_objects as go
+    
+    # Plantilla de los gráficos del módulo: la de Plotly más la altura común,
+    # registrada una sola vez y aplicada figura a figura (no como plantilla
+    # global, que alteraría también los gráficos propios de cada página)
+    _registrar_plantilla(_PLANTILLA, 'plotly', height=400)
+    
+    return go
+
+
+def __getattr__(nombre: str):
+    """Acceso diferido a los módulos que antes se importaban al cargar (PEP 562)"""
+    if nombre == 'go':
+        return _plotly()
+    if nombre == 'pio':
+        _plotly()
+        import plotly.io as pio
+        return pio
+    if nombre == 'px':
+        import plotly.express as px
+        return px
+    if nombre == 'pd':
+        import pandas as pd
+        return pd
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 
 def crear_grafico_barras_simple(x: List, y: List, titulo: str = "",
                                 xlabel: str = "", ylabel: str = "",
-                                color: str = "#4ECDC4") -> go.Figure:
+                                color: str = "#4ECDC4") -> 'go.Figure':
     """
     Crea un gráfico de barras simple.
     
@@ -28,17 +89,19 @@ def crear_grafico_barras_simple(x: List, y: List, titulo: str = "",
     Returns:
         Figura de Plotly
     """
+    go = _plotly()
+    y = np.asarray(y)
     fig = go.Figure(data=[
         go.Bar(x=x, y=y, marker_color=color,
-               text=[f"{v:,.0f}" for v in y],
+               text=y, texttemplate='%{y:,.0f}',
                textposition='auto')
     ])
     
     fig.update_layout(
+        template=_PLANTILLA,
         title=titulo,
         xaxis_title=xlabel,
         yaxis_title=ylabel,
-        height=400,
         showlegend=False
     )
     
@@ -47,7 +110,7 @@ def crear_grafico_barras_simple(x: List, y: List, titulo: str = "",
 
 def crear_grafico_lineas(x: List, y: List, titulo: str = "",
                         xlabel: str = "", ylabel: str = "",
-                        nombre: str = "Serie") -> go.Figure:
+                        nombre: str = "Serie") -> 'go.Figure':
     """
     Crea un gráfico de líneas.
     
@@ -62,6 +125,7 @@ def crear_grafico_lineas(x: List, y: List, titulo: str = "",
     Returns:
         Figura de Plotly
     """
+    go = _plotly()
     fig = go.Figure(data=[
         go.Scatter(x=x, y=y, mode='lines+markers',
                   name=nombre, line=dict(width=3, color='#4ECDC4'),
@@ -69,10 +133,10 @@ def crear_grafico_lineas(x: List, y: List, titulo: str = "",
     ])
     
     fig.update_layout(
+        template=_PLANTILLA,
         title=titulo,
         xaxis_title=xlabel,
         yaxis_title=ylabel,
-        height=400,
         hovermode='x unified'
     )
     
@@ -80,7 +144,7 @@ def crear_grafico_lineas(x: List, y: List, titulo: str = "",
 
 
 def crear_grafico_pie(labels: List, values: List, 
-                     titulo: str = "") -> go.Figure:
+                     titulo: str = "") -> 'go.Figure':
     """
     Crea un gráfico circular (pie).
     
@@ -92,27 +156,22 @@ def crear_grafico_pie(labels: List, values: List,
     Returns:
         Figura de Plotly
     """
-    colors = ['#FF6B6B', '#4ECDC4', '#95E1D3', '#FFD93D', 
-              '#6C5CE7', '#A29BFE', '#FD79A8', '#FDCB6E']
-    
+    go = _plotly()
     fig = go.Figure(data=[
         go.Pie(labels=labels, values=values, hole=0.4,
-               marker=dict(colors=colors),
+               marker=dict(colors=_PALETA),
                textinfo='label+percent',
                textposition='auto')
     ])
     
-    fig.update_layout(
-        title=titulo,
-        height=400
-    )
+    fig.update_layout(title=titulo, template=_PLANTILLA)
     
     return fig
 
 
 def crear_grafico_radar(categorias: List, valores: List,
                        titulo: str = "",
-                       nombre: str = "Métrica") -> go.Figure:
+                       nombre: str = "Métrica") -> 'go.Figure':
     """
     Crea un gráfico de radar (araña).
     
@@ -125,6 +184,7 @@ def crear_grafico_radar(categorias: List, valores: List,
     Returns:
         Figura de Plotly
     """
+    go = _plotly()
     fig = go.Figure(data=[
         go.Scatterpolar(
             r=valores,
@@ -136,6 +196,7 @@ def crear_grafico_radar(categorias: List, valores: List,
     ])
     
     fig.update_layout(
+        template=_PLANTILLA,
         polar=dict(
             radialaxis=dict(visible=True, range=[0, max(valores) * 1.2])
         ),
@@ -149,7 +210,7 @@ def crear_grafico_radar(categorias: List, valores: List,
 
 def crear_grafico_gauge(valor: float, titulo: str = "",
                        rango_min: float = 0,
-                       rango_max: float = 100) -> go.Figure:
+                       rango_max: float = 100) -> 'go.Figure':
     """
     Crea un gráfico de velocímetro (gauge).
     
@@ -162,6 +223,7 @@ def crear_grafico_gauge(valor: float, titulo: str = "",
     Returns:
         Figura de Plotly
     """
+    go = _plotly()
     fig = go.Figure(go.Indicator(
         mode="gauge+number+delta",
         value=valor,
@@ -187,13 +249,13 @@ def crear_grafico_gauge(valor: float, titulo: str = "",
         }
     ))
     
-    fig.update_layout(height=400)
+    fig.update_layout(template=_PLANTILLA)
     
     return fig
 
 
-def crear_grafico_comparacion_escenarios(df_escenarios: pd.DataFrame,
-                                        metrica: str = "van") -> go.Figure:
+def crear_grafico_comparacion_escenarios(df_escenarios: 'pd.DataFrame',
+                                        metrica: str = "van") -> 'go.Figure':
     """
     Crea gráfico comparativo de escenarios.
     
@@ -204,6 +266,7 @@ def crear_grafico_comparacion_escenarios(df_escenarios: pd.DataFrame,
     Returns:
         Figura de Plotly
     """
+    go = _plotly()
     colores = {'Pesimista': '#FF6B6B', 'Base': '#FFD93D', 'Optimista': '#95E1D3'}
     
     fig = go.Figure()
@@ -217,23 +280,23 @@ def crear_grafico_comparacion_escenarios(df_escenarios: pd.DataFrame,
             y=[valor],
             name=escenario,
             marker_color=color,
-            text=[f"{valor:,.0f}"],
+            texttemplate='%{y:,.0f}',
             textposition='auto'
         ))
     
     fig.update_layout(
+        template=_PLANTILLA,
         title=f"Comparación de {metrica.upper()} por Escenario",
         xaxis_title="Escenario",
         yaxis_title=metrica.upper(),
-        showlegend=False,
-        height=400
+        showlegend=False
     )
     
     return fig
 
 
 def crear_grafico_flujo_caja(flujo: List[float], 
-                            titulo: str = "Flujo de Caja") -> go.Figure:
+                            titulo: str = "Flujo de Caja") -> 'go.Figure':
     """
     Crea gráfico de flujo de caja.
     
@@ -244,10 +307,30 @@ def crear_grafico_flujo_caja(flujo: List[float],
     Returns:
         Figura de Plotly
     """
-    periodos = list(range(len(flujo)))
-    flujo_acumulado = np.cumsum(flujo)
-    
-    colores = ['red' if x < 0 else 'green' for x in flujo]
+    go = _plotly()
+    flujo = np.asarray(flujo, dtype=np.float64)
+    flujo_acumulado = flujo.cumsum()
+    periodos = np.arange(flujo.size)
+    
+    titulo_eje_x = "Período (mes)"
+    nombre_barras = 'Flujo Mensual'
+    titulo_eje_y = "Flujo Mensual (S/.)"
+    
+    # Agrupar flujos muy largos en bloques (el navegador es el cuello de
+    # botella): cada barra suma su bloque, así ningún período desaparece,
+    # y el acumulado se toma al cierre de cada bloque
+    if flujo.size > _MAX_PUNTOS_FLUJO:
+        paso = -(-flujo.size // _MAX_PUNTOS_FLUJO)
+        inicios = np.arange(0, flujo.size, paso)
+        cierres = np.minimum(inicios + paso, flujo.size) - 1
+        flujo = np.add.reduceat(flujo, inicios)
+        flujo_acumulado = flujo_acumulado[cierres]
+        periodos = inicios
+        titulo_eje_x = f"Período (mes, agrupado cada {paso} meses)"
+        nombre_barras = f'Flujo por bloque de {paso} meses'
+        titulo_eje_y = f"Flujo por bloque de {paso} meses (S/.)"
+    
+    colores = np.where(flujo < 0, 'red', 'green')
     
     fig = go.Figure()
     
@@ -255,7 +338,7 @@ def crear_grafico_flujo_caja(flujo: List[float],
     fig.add_trace(go.Bar(
         x=periodos,
         y=flujo,
-        name='Flujo Mensual',
+        name=nombre_barras,
         marker_color=colores
     ))
     
@@ -270,20 +353,20 @@ def crear_grafico_flujo_caja(flujo: List[float],
     ))
     
     fig.update_layout(
+        template=_PLANTILLA,
         title=titulo,
-        xaxis_title="Período (mes)",
-        yaxis=dict(title="Flujo Mensual (S/.)"),
+        xaxis_title=titulo_eje_x,
+        yaxis=dict(title=titulo_eje_y),
         yaxis2=dict(title="Flujo Acumulado (S/.)", overlaying='y', side='right'),
-        height=400,
         hovermode='x unified'
     )
     
     return fig
 
 
-def crear_heatmap_sensibilidad(df: pd.DataFrame,
+def crear_heatmap_sensibilidad(df: 'pd.DataFrame',
                                x_col: str, y_col: str, valor_col: str,
-                               titulo: str = "Análisis de Sensibilidad") -> go.Figure:
+                               titulo: str = "Análisis de Sensibilidad") -> 'go.Figure':
     """
     Crea un mapa de calor para análisis de sensibilidad.
     
@@ -297,19 +380,36 @@ def crear_heatmap_sensibilidad(df: pd.DataFrame,
     Returns:
         Figura de Plotly
     """
-    pivot = df.pivot(index=y_col, columns=x_col, values=valor_col)
+    go = _plotly()
+    
+    # Una grilla completa ordenada por (y, x) ya es la matriz del mapa de calor
+    datos = df.sort_values([y_col, x_col], kind='stable')
+    x_vals = np.unique(datos[x_col].to_numpy())
+    y_vals = datos[y_col].unique()
+    
+    # Completa solo si cada par (y, x) aparece exactamente una vez: con pares
+    # repetidos y celdas faltantes el conteo coincidiría igual
+    if (len(datos) == len(x_vals) * len(y_vals) and
+            not datos.duplicated([y_col, x_col]).any()):
+        z = datos[valor_col].to_numpy().reshape(len(y_vals), len(x_vals))
+    else:
+        # Grilla incompleta: pivot rellena las combinaciones faltantes
+        # (y rechaza pares repetidos)
+        pivot = df.pivot(index=y_col, columns=x_col, values=valor_col)
+        z, x_vals, y_vals = pivot.to_numpy(), pivot.columns, pivot.index
     
     fig = go.Figure(data=go.Heatmap(
-        z=pivot.values,
-        x=pivot.columns,
-        y=pivot.index,
+        z=z,
+        x=x_vals,
+        y=y_vals,
         colorscale='RdYlGn',
-        text=pivot.values,
+        text=z,
         texttemplate='%{text:,.0f}',
         textfont={"size": 10}
     ))
     
     fig.update_layout(
+        template=_PLANTILLA,
         title=titulo,
         xaxis_title=x_col,
         yaxis_title=y_col,
@@ -321,7 +421,7 @@ def crear_heatmap_sensibilidad(df: pd.DataFrame,
 
 def crear_grafico_distribucion(valores: List[float],
                                titulo: str = "Distribución",
-                               nombre: str = "Distribución") -> go.Figure:
+                               nombre: str = "Distribución") -> 'go.Figure':
     """
     Crea un histograma de distribución.
     
@@ -333,6 +433,7 @@ def crear_grafico_distribucion(valores: List[float],
     Returns:
         Figura de Plotly
     """
+    go = _plotly()
     fig = go.Figure(data=[
         go.Histogram(x=valores, name=nombre,
                     marker_color='#4ECDC4',
@@ -340,18 +441,18 @@ def crear_grafico_distribucion(valores: List[float],
     ])
     
     fig.update_layout(
+        template=_PLANTILLA,
         title=titulo,
         xaxis_title="Valor",
         yaxis_title="Frecuencia",
-        showlegend=False,
-        height=400
+        showlegend=False
     )
     
     return fig
 
 
 def crear_grafico_boxplot(datos: Dict[str, List[float]],
-                          titulo: str = "Box Plot") -> go.Figure:
+                          titulo: str = "Box Plot") -> 'go.Figure':
     """
     Crea un diagrama de caja (box plot).
     
@@ -362,6 +463,7 @@ def crear_grafico_boxplot(datos: Dict[str, List[float]],
     Returns:
         Figura de Plotly
     """
+    go = _plotly()
     fig = go.Figure()
     
     for nombre, valores in datos.items():
@@ -369,17 +471,17 @@ def crear_grafico_boxplot(datos: Dict[str, List[float]],
                             marker_color='#4ECDC4'))
     
     fig.update_layout(
+        template=_PLANTILLA,
         title=titulo,
         yaxis_title="Valor",
-        showlegend=True,
-        height=400
+        showlegend=True
     )
     
     return fig
 
 
 def crear_grafico_cascada(categorias: List[str], valores: List[float],
-                         titulo: str = "Análisis de Cascada") -> go.Figure:
+                         titulo: str = "Análisis de Cascada") -> 'go.Figure':
     """
     Crea un gráfico de cascada (waterfall).
     
@@ -391,28 +493,31 @@ def crear_grafico_cascada(categorias: List[str], valores: List[float],
     Returns:
         Figura de Plotly
     """
+    go = _plotly()
+    valores = np.asarray(valores)
     fig = go.Figure(go.Waterfall(
         name="Análisis",
         orientation="v",
         measure=["relative"] * (len(valores) - 1) + ["total"],
         x=categorias,
         textposition="outside",
-        text=[f"S/. {v:,.0f}" for v in valores],
+        text=valores,
+        texttemplate='S/. %{text:,.0f}',
         y=valores,
         connector={"line": {"color": "rgb(63, 63, 63)"}},
     ))
     
     fig.update_layout(
+        template=_PLANTILLA,
         title=titulo,
-        showlegend=False,
-        height=400
+        showlegend=False
     )
     
     return fig
 
 
-def aplicar_tema_personalizado(fig: go.Figure,
-                              color_fondo: str = "#f5f5f5") -> go.Figure:
+def aplicar_tema_personalizado(fig: 'go.Figure',
+                              color_fondo: str = "#f5f5f5") -> 'go.Figure':
     """
     Aplica tema personalizado a una figura.
     
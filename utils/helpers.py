@@ -4,11 +4,36 @@ Utilidades y Funciones Auxiliares
 Funciones de ayuda comunes para todo el sistema.
 """
 
-import streamlit as st
 from datetime import datetime, date
+from functools import lru_cache
+from itertools import count
+from types import MappingProxyType
 import json
 import os
-from typing import Any, Dict
+import time
+import numpy as np
+from typing import Any, Dict, Tuple
+
+# Colores de semáforo, de mejor a peor: Verde, Amarillo, Rojo
+_PALETA_SEMAFORO = np.array(["#95E1D3", "#FFD93D", "#FF6B6B"])
+
+# Emoji por categoría (en mayúsculas)
+_EMOJIS = MappingProxyType({
+    'BAJO': '✅',
+    'MEDIO': '⚠️',
+    'ALTO': '🔴',
+    'EXCELENTE': '🌟',
+    'BUENO': '👍',
+    'REGULAR': '😐',
+    'MALO': '👎',
+    'VIABLE': '✅',
+    'NO VIABLE': '❌'
+})
+
+_MESES = (
+    "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+    "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
+)
 
 
 def formatear_moneda(valor: float, moneda: str = "S/.") -> str:
@@ -52,10 +77,13 @@ def formatear_numero(valor: float, decimales: int = 2,
     Returns:
         String formateado
     """
-    if separador_miles:
-        return f"{valor:,.{decimales}f}"
-    else:
-        return f"{valor:.{decimales}f}"
+    return format(valor, _formato_numero(decimales, separador_miles))
+
+
+@lru_cache(maxsize=8)
+def _formato_numero(decimales: int, separador_miles: bool) -> str:
+    """Especificación de formato para formatear_numero"""
+    return f"{',' if separador_miles else ''}.{decimales}f"
 
 
 def calcular_diferencia_dias(fecha1: date, fecha2: date) -> int:
@@ -98,13 +126,16 @@ def calcular_promedio_ponderado(valores: list, pesos: list) -> float:
     Returns:
         Promedio ponderado
     """
-    if len(valores) != len(pesos):
+    valores = np.asarray(valores, dtype=np.float64)
+    pesos = np.asarray(pesos, dtype=np.float64)
+    if valores.shape != pesos.shape:
         raise ValueError("Valores y pesos deben tener la misma longitud")
     
-    if sum(pesos) == 0:
-        return 0
+    total_pesos = pesos.sum()
+    if total_pesos == 0:
+        return 0.0
     
-    return sum(v * p for v, p in zip(valores, pesos)) / sum(pesos)
+    return float(valores @ pesos / total_pesos)
 
 
 def crear_directorio_si_no_existe(ruta: str):
@@ -114,8 +145,8 @@ def crear_directorio_si_no_existe(ruta: str):
     Args:
         ruta: Ruta del directorio
     """
-    if not os.path.exists(ruta):
-        os.makedirs(ruta)
+    if ruta:
+        os.makedirs(ruta, exist_ok=True)
 
 
 def guardar_json(datos: Dict, ruta: str):
@@ -156,12 +187,17 @@ def limpiar_session_state(excluir: list = None):
     Args:
         excluir: Lista de claves a no eliminar
     """
-    if excluir is None:
-        excluir = []
+    import streamlit as st
+    
+    excluir = frozenset(excluir or ())
+    if not excluir:
+        st.session_state.clear()
+        return
     
-    keys_to_delete = [k for k in st.session_state.keys() if k not in excluir]
-    for key in keys_to_delete:
-        del st.session_state[key]
+    # Copia de las claves: no se puede borrar mientras se itera el estado
+    for key in tuple(st.session_state.keys()):
+        if key not in excluir:
+            del st.session_state[key]
 
 
 def obtener_color_por_valor(valor: float, umbral_bajo: float, 
@@ -178,20 +214,45 @@ def obtener_color_por_valor(valor: float, umbral_bajo: float,
     Returns:
         String con código de color
     """
+    return obtener_colores_por_valor(valor, umbral_bajo, umbral_alto, invertir).item()
+
+
+@lru_cache(maxsize=32)
+def _limites_semaforo(umbral_bajo: float, umbral_alto: float, invertir: bool) -> np.ndarray:
+    """
+    Límites de los tramos del semáforo (Verde, Amarillo, Rojo).
+    
+    Sin invertir (mayor es mejor) los límites se expresan sobre el valor
+    negado, de modo que en ambos casos un tramo más alto es un color peor.
+    """
     if invertir:
-        if valor <= umbral_bajo:
-            return "#95E1D3"  # Verde
-        elif valor <= umbral_alto:
-            return "#FFD93D"  # Amarillo
-        else:
-            return "#FF6B6B"  # Rojo
+        limites = np.array([umbral_bajo, umbral_alto], dtype=np.float64)
     else:
-        if valor >= umbral_alto:
-            return "#95E1D3"  # Verde
-        elif valor >= umbral_bajo:
-            return "#FFD93D"  # Amarillo
-        else:
-            return "#FF6B6B"  # Rojo
+        limites = np.array([-umbral_alto, -umbral_bajo], dtype=np.float64)
+    limites.setflags(write=False)
+    return limites
+
+
+def obtener_colores_por_valor(valores, umbral_bajo: float, umbral_alto: float,
+                              invertir: bool = False) -> np.ndarray:
+    """
+    Versión vectorizada de obtener_color_por_valor.
+    
+    Args:
+        valores: Valor o array de valores a evaluar
+        umbral_bajo: Umbral bajo
+        umbral_alto: Umbral alto
+        invertir: Si invertir la lógica (menor es mejor)
+        
+    Returns:
+        Array con el código de color de cada valor (NaN se marca en rojo)
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    if not invertir:
+        valores = -valores
+    return _PALETA_SEMAFORO[np.searchsorted(
+        _limites_semaforo(umbral_bajo, umbral_alto, invertir), valores, side='left'
+    )]
 
 
 def obtener_emoji_por_categoria(categoria: str) -> str:
@@ -204,19 +265,7 @@ def obtener_emoji_por_categoria(categoria: str) -> str:
     Returns:
         String con emoji
     """
-    emojis = {
-        'BAJO': '✅',
-        'MEDIO': '⚠️',
-        'ALTO': '🔴',
-        'EXCELENTE': '🌟',
-        'BUENO': '👍',
-        'REGULAR': '😐',
-        'MALO': '👎',
-        'VIABLE': '✅',
-        'NO VIABLE': '❌'
-    }
-    
-    return emojis.get(categoria.upper(), '❓')
+    return _EMOJIS.get(categoria.upper(), '❓')
 
 
 def truncar_texto(texto: str, longitud_maxima: int = 50) -> str:
@@ -235,6 +284,7 @@ def truncar_texto(texto: str, longitud_maxima: int = 50) -> str:
     return texto[:longitud_maxima - 3] + "..."
 
 
+@lru_cache(maxsize=128, typed=True)
 def convertir_meses_a_texto(meses: int) -> str:
     """
     Convierte número de meses a texto legible.
@@ -274,6 +324,7 @@ def calcular_tasa_crecimiento(valor_inicial: float, valor_final: float) -> float
     return (valor_final - valor_inicial) / valor_inicial
 
 
+@lru_cache(maxsize=128, typed=True)
 def obtener_nombre_mes(numero_mes: int) -> str:
     """
     Retorna el nombre del mes dado su número.
@@ -284,36 +335,48 @@ def obtener_nombre_mes(numero_mes: int) -> str:
     Returns:
         Nombre del mes
     """
-    meses = [
-        "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
-        "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
-    ]
-    
     if 1 <= numero_mes <= 12:
-        return meses[numero_mes - 1]
+        return _MESES[numero_mes - 1]
     return "Mes inválido"
 
 
 def mostrar_alerta_exitosa(mensaje: str):
     """Muestra una alerta de éxito en Streamlit"""
+    import streamlit as st
     st.success(f"✅ {mensaje}")
 
 
 def mostrar_alerta_error(mensaje: str):
     """Muestra una alerta de error en Streamlit"""
+    import streamlit as st
     st.error(f"❌ {mensaje}")
 
 
 def mostrar_alerta_advertencia(mensaje: str):
     """Muestra una alerta de advertencia en Streamlit"""
+    import streamlit as st
     st.warning(f"⚠️ {mensaje}")
 
 
 def mostrar_alerta_info(mensaje: str):
     """Muestra una alerta informativa en Streamlit"""
+    import streamlit as st
     st.info(f"ℹ️ {mensaje}")
 
 
+# Plantillas HTML de crear_card_metrica (fijas, solo cambian los valores)
+_CARD_HTML = """
+    <div style="background: linear-gradient(135deg, {color} 0%, {color}CC 100%); 
+                padding: 20px; border-radius: 10px; text-align: center; 
+                box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
+        <h4 style="color: white; margin: 0 0 10px 0;">{titulo}</h4>
+        <h2 style="color: white; margin: 0;">{valor}</h2>
+        {delta_html}
+    </div>
+    """
+_DELTA_HTML = '<p style="color: #666; margin: 5px 0 0 0;">{}</p>'
+
+
 def crear_card_metrica(titulo: str, valor: Any, delta: Any = None,
                       color: str = "#4ECDC4"):
     """
@@ -325,19 +388,14 @@ def crear_card_metrica(titulo: str, valor: Any, delta: Any = None,
         delta: Valor delta (opcional)
         color: Color de fondo
     """
+    import streamlit as st
+    
     delta_html = ""
     if delta is not None:
-        delta_html = f'<p style="color: #666; margin: 5px 0 0 0;">{delta}</p>'
+        delta_html = _DELTA_HTML.format(delta)
     
-    card_html = f"""
-    <div style="background: linear-gradient(135deg, {color} 0%, {color}CC 100%); 
-                padding: 20px; border-radius: 10px; text-align: center; 
-                box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-        <h4 style="color: white; margin: 0 0 10px 0;">{titulo}</h4>
-        <h2 style="color: white; margin: 0;">{valor}</h2>
-        {delta_html}
-    </div>
-    """
+    card_html = _CARD_HTML.format(color=color, titulo=titulo, valor=valor,
+                                  delta_html=delta_html)
     
     st.markdown(card_html, unsafe_allow_html=True)
 
@@ -353,18 +411,35 @@ def validar_datos_completos(datos: Dict, campos_requeridos: list) -> Tuple[bool,
     Returns:
         Tupla (es_valido, campos_faltantes)
     """
+    if not campos_requeridos:
+        return True, []
+    
     campos_faltantes = [campo for campo in campos_requeridos if campo not in datos]
     return len(campos_faltantes) == 0, campos_faltantes
 
 
+# Contador del proceso para distinguir IDs generados en el mismo instante
+_contador_ids = count()
+
+
+@lru_cache(maxsize=1)
+def _prefijo_fecha(ordinal: int) -> str:
+    """Fecha AAAAMMDD del día indicado (se formatea una vez por día)"""
+    return date.fromordinal(ordinal).strftime("%Y%m%d")
+
+
 def generar_id_unico() -> str:
     """
     Genera un ID único basado en timestamp.
     
     Returns:
-        String con ID único
+        String con ID único: fecha (AAAAMMDD), instante en nanosegundos en
+        base 36 y contador del proceso
     """
-    return datetime.now().strftime("%Y%m%d%H%M%S")
+    return (
+        f"{_prefijo_fecha(date.today().toordinal())}-"
+        f"{np.base_repr(time.time_ns(), 36)}-{next(_contador_ids)}"
+    )
 
 
 def redondear_a_multiplo(valor: float, multiplo: int) -> int:
@@ -6,90 +6,415 @@ Funciones para cargar y validar datos del sistema.
 
 import pandas as pd
 import json
-from typing import Dict, List, Optional
+from functools import lru_cache
+from importlib.util import find_spec
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
 import os
+import threading
+
+# orjson es opcional: si está instalado se usa para leer los JSON de
+# referencia; si no, _leer_json recurre al módulo json estándar
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    _ORJSON_AVAILABLE = False
+
+# PyArrow es opcional: si está instalado se usa su lector de CSV multihilo
+_PYARROW_AVAILABLE = find_spec('pyarrow') is not None
+
+# Archivo de cada conjunto de datos dentro de data_dir
+_ARCHIVOS_DATOS = MappingProxyType({
+    'clima': 'clima_simulado.csv',
+    'precios': 'precios_historicos.csv',
+    'cultivos': 'cultivos.json',
+    'ubicaciones': 'ubicaciones.json'
+})
+
+# Entradas de caché de cada conjunto: la principal y sus tablas derivadas
+_CLAVES_CACHE = MappingProxyType({
+    'clima': ('clima', 'clima_idx', 'clima_stats'),
+    'precios': ('precios', 'precio_lookup', 'precios_stats'),
+    'cultivos': ('cultivos', 'cultivos_index', 'cultivos_nombres'),
+    'ubicaciones': ('ubicaciones', 'regiones_index', 'regiones_nombres')
+})
+
+# Carpeta (junto a los CSV) donde se guardan sus copias Parquet
+_DIR_CACHE_PARQUET = '.cache'
+
+
+# Nombre de cada mes tal como aparece en los CSV
+_MESES = MappingProxyType({
+    1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril',
+    5: 'Mayo', 6: 'Junio', 7: 'Julio', 8: 'Agosto',
+    9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre'
+})
+
+
+def _ruta_parquet(ruta: str) -> str:
+    """
+    Ruta de la copia Parquet de un CSV dentro de la carpeta .cache.
+    
+    Args:
+        ruta: Ruta del archivo CSV
+        
+    Returns:
+        Ruta del archivo Parquet correspondiente
+    """
+    directorio, archivo = os.path.split(ruta)
+    nombre = os.path.splitext(archivo)[0] + '.parquet'
+    return os.path.join(directorio, _DIR_CACHE_PARQUET, nombre)
+
+
+def _guardar_parquet(df: pd.DataFrame, ruta_parquet: str):
+    """
+    Guarda la copia Parquet de un CSV; si no se puede escribir se ignora.
+    
+    Args:
+        df: DataFrame ya tipado
+        ruta_parquet: Ruta de destino
+    """
+    temporal = ruta_parquet + '.tmp'
+    try:
+        os.makedirs(os.path.dirname(ruta_parquet), exist_ok=True)
+        df.to_parquet(temporal, compression='zstd')
+        # Reemplazo atómico: otro proceso nunca lee un archivo a medio escribir
+        os.replace(temporal, ruta_parquet)
+    except OSError:
+        pass
+
+
+def _leer_csv(ruta: str, categoricas: List[str]) -> pd.DataFrame:
+    """
+    Lee un CSV de datos de referencia.
+    
+    Con PyArrow disponible se reutiliza una copia Parquet en data/.cache
+    mientras sea más reciente que el CSV, evitando volver a tokenizar el
+    texto en cada proceso.
+    
+    Args:
+        ruta: Ruta del archivo CSV
+        categoricas: Columnas de texto repetido a convertir en category
+        
+    Returns:
+        DataFrame con las columnas indicadas como category
+    """
+    if _PYARROW_AVAILABLE:
+        ruta_parquet = _ruta_parquet(ruta)
+        try:
+            if os.path.getmtime(ruta_parquet) >= os.path.getmtime(ruta):
+                return pd.read_parquet(ruta_parquet)
+        except (OSError, ValueError):
+            # Sin copia, CSV ausente o Parquet ilegible: se lee el CSV
+            pass
+        df = pd.read_csv(ruta, engine='pyarrow')
+    else:
+        df = pd.read_csv(ruta)
+    
+    for columna in categoricas:
+        if columna in df.columns:
+            df[columna] = df[columna].astype('category')
+    
+    if _PYARROW_AVAILABLE:
+        _guardar_parquet(df, ruta_parquet)
+    return df
+
+
+def _leer_json(ruta: str) -> Dict:
+    """
+    Lee un JSON de datos de referencia, con orjson si está disponible.
+    
+    Args:
+        ruta: Ruta del archivo JSON
+        
+    Returns:
+        Contenido del archivo
+    """
+    if _ORJSON_AVAILABLE:
+        # orjson trabaja sobre bytes UTF-8
+        with open(ruta, 'rb') as f:
+            return orjson.loads(f.read())
+    
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _indice_por_nombre(elementos: List[Dict]) -> Dict[str, Dict]:
+    """
+    Indexa elementos por su nombre sin distinguir mayúsculas.
+    
+    Args:
+        elementos: Lista de diccionarios con clave 'nombre'
+        
+    Returns:
+        Dict {nombre normalizado: elemento}; ante nombres repetidos
+        se conserva el primero, como en una búsqueda secuencial
+    """
+    indice = {}
+    for elemento in elementos:
+        indice.setdefault(elemento['nombre'].casefold(), elemento)
+    return indice
+
+
+def _indexar_filas(df: pd.DataFrame, claves: List[str]) -> pd.DataFrame:
+    """
+    Indexa un DataFrame por sus columnas clave para búsquedas por .loc.
+    
+    Args:
+        df: DataFrame original
+        claves: Columnas que identifican una fila
+        
+    Returns:
+        DataFrame con índice único (se conserva la primera fila de cada
+        clave, como en un filtrado seguido de iloc[0]) y las columnas intactas
+    """
+    return df.drop_duplicates(claves).set_index(claves, drop=False)
+
+
+def _indexar_registros(df: pd.DataFrame, claves: List[str]) -> Dict[tuple, Dict]:
+    """
+    Convierte cada fila en un dict de escalares Python indexado por sus claves.
+    
+    Args:
+        df: DataFrame original
+        claves: Columnas que identifican una fila
+        
+    Returns:
+        Dict {tupla de claves: fila}; ante claves repetidas se conserva
+        la primera fila, como en un filtrado seguido de iloc[0]
+    """
+    registros = {}
+    for registro in df.to_dict('records'):
+        registros.setdefault(tuple(registro[c] for c in claves), registro)
+    return registros
+
+
+def _cargar_clima(ruta: str, cache: Dict):
+    """
+    Carga los datos climáticos y sus tablas derivadas en el caché.
+    
+    Args:
+        ruta: Ruta del CSV de clima
+        cache: Dict de caché a poblar
+    """
+    df = _leer_csv(ruta, ['region', 'mes'])
+    cache['clima_idx'] = _indexar_registros(df, ['region', 'mes'])
+    # La clave principal se publica al final: marca la carga completa
+    cache['clima'] = df
+
+
+def _cargar_precios(ruta: str, cache: Dict):
+    """
+    Carga los precios históricos y su tabla de búsqueda en el caché.
+    
+    Args:
+        ruta: Ruta del CSV de precios
+        cache: Dict de caché a poblar
+    """
+    df = _leer_csv(ruta, ['cultivo', 'mes'])
+    # Solo la columna de precio: tabla de búsqueda mínima
+    cache['precio_lookup'] = _indexar_filas(
+        df, ['cultivo', 'año', 'mes']
+    )['precio_promedio_soles_kg']
+    cache['precios'] = df
+
+
+def _cargar_cultivos(ruta: str, cache: Dict):
+    """
+    Carga la información de cultivos y sus índices en el caché.
+    
+    Args:
+        ruta: Ruta del JSON de cultivos
+        cache: Dict de caché a poblar
+    """
+    data = _leer_json(ruta)
+    cultivos = data.get('cultivos', [])
+    cache['cultivos_index'] = _indice_por_nombre(cultivos)
+    cache['cultivos_nombres'] = tuple(c['nombre'] for c in cultivos)
+    cache['cultivos'] = data
+
+
+def _cargar_ubicaciones(ruta: str, cache: Dict):
+    """
+    Carga la información de regiones y sus índices en el caché.
+    
+    Args:
+        ruta: Ruta del JSON de ubicaciones
+        cache: Dict de caché a poblar
+    """
+    data = _leer_json(ruta)
+    regiones = data.get('regiones', [])
+    cache['regiones_index'] = _indice_por_nombre(regiones)
+    cache['regiones_nombres'] = tuple(r['nombre'] for r in regiones)
+    cache['ubicaciones'] = data
+
+
+def _estadisticas_precios(df: pd.DataFrame) -> Dict[str, Dict]:
+    """
+    Calcula las estadísticas de precio de todos los cultivos.
+    
+    Args:
+        df: DataFrame de precios históricos
+        
+    Returns:
+        Dict {cultivo: estadísticas}
+    """
+    # Una sola pasada agrupada para todos los cultivos
+    tabla = df.groupby('cultivo', observed=True).agg(
+        precio_medio=('precio_promedio_soles_kg', 'mean'),
+        precio_minimo=('precio_promedio_soles_kg', 'min'),
+        precio_maximo=('precio_promedio_soles_kg', 'max'),
+        desviacion_estandar=('precio_promedio_soles_kg', 'std')
+    )
+    tabla['volatilidad'] = tabla['desviacion_estandar'] / tabla['precio_medio']
+    return tabla.to_dict('index')
+
+
+def _estadisticas_clima(df: pd.DataFrame) -> Dict[str, Dict]:
+    """
+    Calcula las estadísticas climáticas de todas las regiones.
+    
+    Args:
+        df: DataFrame de datos climáticos
+        
+    Returns:
+        Dict {región: estadísticas}
+    """
+    # Una sola pasada agrupada para todas las regiones
+    return df.groupby('region', observed=True).agg(
+        temperatura_promedio=('temperatura_promedio', 'mean'),
+        precipitacion_anual=('precipitacion_mm', 'sum'),
+        humedad_promedio=('humedad_relativa', 'mean'),
+        riesgo_sequia_promedio=('riesgo_sequia', 'mean'),
+        riesgo_heladas_promedio=('riesgo_heladas', 'mean'),
+        riesgo_inundacion_promedio=('riesgo_inundacion', 'mean')
+    ).to_dict('index')
+
+
+# Función de carga de cada conjunto de datos
+_CARGADORES = MappingProxyType({
+    'clima': _cargar_clima,
+    'precios': _cargar_precios,
+    'cultivos': _cargar_cultivos,
+    'ubicaciones': _cargar_ubicaciones
+})
 
 
 class DataLoader:
-    """Clase para cargar y gestionar datos del sistema"""
+    """
+    Clase para cargar y gestionar datos del sistema.
+    
+    Los cargadores devuelven los datos en caché sin copiarlos: los
+    DataFrame no deben modificarse y los diccionarios se entregan como
+    vistas de solo lectura. Usar copy=True para obtener una copia propia.
+    """
     
     def __init__(self, data_dir: str = 'data'):
         self.data_dir = data_dir
         self._cache = {}
+        # Evita que hilos concurrentes analicen el mismo archivo a la vez;
+        # reentrante para que un cargador pueda invocar a otro
+        self._lock = threading.RLock()
+        # Archivos de los que depende el cargador
+        self._rutas = {
+            clave: os.path.join(data_dir, archivo)
+            for clave, archivo in _ARCHIVOS_DATOS.items()
+        }
+    
+    def _cache_cargado(self, conjunto: str) -> Optional[Dict]:
+        """
+        Carga un conjunto de datos si hace falta y devuelve el caché que lo contiene.
+        
+        Se devuelve el propio dict: los llamadores leen solo de él, de modo
+        que un limpiar_cache concurrente (que reemplaza self._cache) nunca
+        les retira una entrada entre la comprobación y la lectura.
+        
+        Args:
+            conjunto: 'clima', 'precios', 'cultivos' o 'ubicaciones'
+            
+        Returns:
+            Dict de caché con el conjunto y sus tablas derivadas, o None si
+            falta el archivo
+        """
+        cache = self._cache
+        if conjunto not in cache:
+            with self._lock:
+                cache = self._cache
+                if conjunto not in cache:
+                    try:
+                        _CARGADORES[conjunto](self._rutas[conjunto], cache)
+                    except FileNotFoundError:
+                        return None
+        return cache
     
-    def cargar_clima_simulado(self) -> pd.DataFrame:
+    def cargar_clima_simulado(self, copy: bool = False) -> pd.DataFrame:
         """
         Carga datos climáticos simulados.
         
+        Args:
+            copy: Si devolver una copia en lugar de los datos en caché
+            
         Returns:
             DataFrame con datos climáticos
         """
-        if 'clima' in self._cache:
-            return self._cache['clima'].copy()
-        
-        try:
-            ruta = os.path.join(self.data_dir, 'clima_simulado.csv')
-            df = pd.read_csv(ruta)
-            self._cache['clima'] = df
-            return df.copy()
-        except FileNotFoundError:
+        cache = self._cache_cargado('clima')
+        if cache is None:
             return pd.DataFrame()
+        
+        df = cache['clima']
+        return df.copy() if copy else df
     
-    def cargar_precios_historicos(self) -> pd.DataFrame:
+    def cargar_precios_historicos(self, copy: bool = False) -> pd.DataFrame:
         """
         Carga datos de precios históricos.
         
+        Args:
+            copy: Si devolver una copia en lugar de los datos en caché
+            
         Returns:
             DataFrame con precios históricos
         """
-        if 'precios' in self._cache:
-            return self._cache['precios'].copy()
-        
-        try:
-            ruta = os.path.join(self.data_dir, 'precios_historicos.csv')
-            df = pd.read_csv(ruta)
-            self._cache['precios'] = df
-            return df.copy()
-        except FileNotFoundError:
+        cache = self._cache_cargado('precios')
+        if cache is None:
             return pd.DataFrame()
+        
+        df = cache['precios']
+        return df.copy() if copy else df
     
-    def cargar_cultivos(self) -> Dict:
+    def cargar_cultivos(self, copy: bool = False) -> Mapping:
         """
         Carga información de cultivos.
         
+        Args:
+            copy: Si devolver una copia en lugar de los datos en caché
+            
         Returns:
             Dict con información de cultivos
         """
-        if 'cultivos' in self._cache:
-            return self._cache['cultivos'].copy()
-        
-        try:
-            ruta = os.path.join(self.data_dir, 'cultivos.json')
-            with open(ruta, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self._cache['cultivos'] = data
-                return data.copy()
-        except FileNotFoundError:
+        cache = self._cache_cargado('cultivos')
+        if cache is None:
             return {'cultivos': []}
+        
+        data = cache['cultivos']
+        return data.copy() if copy else MappingProxyType(data)
     
-    def cargar_ubicaciones(self) -> Dict:
+    def cargar_ubicaciones(self, copy: bool = False) -> Mapping:
         """
         Carga información de ubicaciones/regiones.
         
+        Args:
+            copy: Si devolver una copia en lugar de los datos en caché
+            
         Returns:
             Dict con información de regiones
         """
-        if 'ubicaciones' in self._cache:
-            return self._cache['ubicaciones'].copy()
-        
-        try:
-            ruta = os.path.join(self.data_dir, 'ubicaciones.json')
-            with open(ruta, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self._cache['ubicaciones'] = data
-                return data.copy()
-        except FileNotFoundError:
+        cache = self._cache_cargado('ubicaciones')
+        if cache is None:
             return {'regiones': []}
+        
+        data = cache['ubicaciones']
+        return data.copy() if copy else MappingProxyType(data)
     
     def obtener_cultivo_por_nombre(self, nombre: str) -> Optional[Dict]:
         """
@@ -101,14 +426,10 @@ class DataLoader:
         Returns:
             Dict con información del cultivo o None
         """
-        data = self.cargar_cultivos()
-        cultivos = data.get('cultivos', [])
-        
-        for cultivo in cultivos:
-            if cultivo['nombre'].lower() == nombre.lower():
-                return cultivo
-        
-        return None
+        cache = self._cache_cargado('cultivos')
+        if cache is None:
+            return None
+        return cache['cultivos_index'].get(nombre.casefold())
     
     def obtener_region_por_nombre(self, nombre: str) -> Optional[Dict]:
         """
@@ -120,14 +441,10 @@ class DataLoader:
         Returns:
             Dict con información de la región o None
         """
-        data = self.cargar_ubicaciones()
-        regiones = data.get('regiones', [])
-        
-        for region in regiones:
-            if region['nombre'].lower() == nombre.lower():
-                return region
-        
-        return None
+        cache = self._cache_cargado('ubicaciones')
+        if cache is None:
+            return None
+        return cache['regiones_index'].get(nombre.casefold())
     
     def obtener_clima_region_mes(self, region: str, mes: int) -> Optional[Dict]:
         """
@@ -140,26 +457,18 @@ class DataLoader:
         Returns:
             Dict con datos climáticos o None
         """
-        df = self.cargar_clima_simulado()
+        cache = self._cache_cargado('clima')
         
-        if df.empty:
+        # Sin archivo no hay tabla indexada: salida inmediata
+        if cache is None:
             return None
         
-        meses = {
-            1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril',
-            5: 'Mayo', 6: 'Junio', 7: 'Julio', 8: 'Agosto',
-            9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre'
-        }
-        
-        nombre_mes = meses.get(mes, '')
-        
-        filtro = (df['region'] == region) & (df['mes'] == nombre_mes)
-        resultado = df[filtro]
+        tabla = cache['clima_idx']
+        nombre_mes = _MESES.get(mes, '')
         
-        if not resultado.empty:
-            return resultado.iloc[0].to_dict()
-        
-        return None
+        registro = tabla.get((region, nombre_mes))
+        # Copia superficial: el llamador puede modificar el dict devuelto
+        return dict(registro) if registro is not None else None
     
     def obtener_precio_cultivo_mes(self, cultivo: str, 
                                    mes: int, año: int = 2023) -> Optional[float]:
@@ -174,26 +483,19 @@ class DataLoader:
         Returns:
             Precio promedio o None
         """
-        df = self.cargar_precios_historicos()
+        cache = self._cache_cargado('precios')
         
-        if df.empty:
+        # Sin archivo no hay tabla de precios: salida inmediata
+        if cache is None:
             return None
         
-        meses = {
-            1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril',
-            5: 'Mayo', 6: 'Junio', 7: 'Julio', 8: 'Agosto',
-            9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre'
-        }
+        precios = cache['precio_lookup']
+        nombre_mes = _MESES.get(mes, '')
         
-        nombre_mes = meses.get(mes, '')
-        
-        filtro = (df['cultivo'] == cultivo) & (df['año'] == año) & (df['mes'] == nombre_mes)
-        resultado = df[filtro]
-        
-        if not resultado.empty:
-            return resultado.iloc[0]['precio_promedio_soles_kg']
-        
-        return None
+        try:
+            return precios.loc[(cultivo, año, nombre_mes)]
+        except KeyError:
+            return None
     
     def listar_cultivos_disponibles(self) -> List[str]:
         """
@@ -202,9 +504,8 @@ class DataLoader:
         Returns:
             Lista de nombres de cultivos
         """
-        data = self.cargar_cultivos()
-        cultivos = data.get('cultivos', [])
-        return [c['nombre'] for c in cultivos]
+        cache = self._cache_cargado('cultivos')
+        return list(cache['cultivos_nombres']) if cache is not None else []
     
     def listar_regiones_disponibles(self) -> List[str]:
         """
@@ -213,9 +514,8 @@ class DataLoader:
         Returns:
             Lista de nombres de regiones
         """
-        data = self.cargar_ubicaciones()
-        regiones = data.get('regiones', [])
-        return [r['nombre'] for r in regiones]
+        cache = self._cache_cargado('ubicaciones')
+        return list(cache['regiones_nombres']) if cache is not None else []
     
     def obtener_cultivos_por_region(self, region: str) -> List[str]:
         """
@@ -228,11 +528,26 @@ class DataLoader:
             Lista de cultivos aptos
         """
         region_info = self.obtener_region_por_nombre(region)
+        return region_info.get('principales_cultivos', []) if region_info else []
+    
+    def cultivos_por_regiones(self, regiones: List[str]) -> Dict[str, List[str]]:
+        """
+        Obtiene los cultivos aptos de varias regiones en una sola llamada.
         
-        if region_info and 'principales_cultivos' in region_info:
-            return region_info['principales_cultivos']
+        Args:
+            regiones: Nombres de las regiones
+            
+        Returns:
+            Dict {región: lista de cultivos aptos}; vacía si no se encuentra
+        """
+        cache = self._cache_cargado('ubicaciones')
+        indice = cache['regiones_index'] if cache is not None else {}
         
-        return []
+        resultado = {}
+        for region in regiones:
+            region_info = indice.get(region.casefold())
+            resultado[region] = region_info.get('principales_cultivos', []) if region_info else []
+        return resultado
     
     def validar_datos_completos(self) -> Dict[str, bool]:
         """
@@ -241,80 +556,105 @@ class DataLoader:
         Returns:
             Dict con estado de cada archivo
         """
-        return {
+        cache = self._cache
+        validacion = cache.get('validacion')
+        if validacion is not None:
+            return validacion.copy()
+        
+        estado = {
             'clima': not self.cargar_clima_simulado().empty,
             'precios': not self.cargar_precios_historicos().empty,
             'cultivos': len(self.cargar_cultivos().get('cultivos', [])) > 0,
             'ubicaciones': len(self.cargar_ubicaciones().get('regiones', [])) > 0
         }
+        
+        # Solo se memoriza un resultado completo: los archivos faltantes no
+        # quedan en caché y deben volver a comprobarse en la siguiente llamada
+        if all(estado.values()):
+            cache['validacion'] = estado
+        return estado.copy()
     
-    def limpiar_cache(self):
-        """Limpia el caché de datos"""
-        self._cache = {}
+    def limpiar_cache(self, conjunto: Optional[str] = None):
+        """
+        Limpia el caché de datos.
+        
+        Args:
+            conjunto: Conjunto a liberar ('clima', 'precios', 'cultivos' o
+                'ubicaciones') junto con sus tablas derivadas; None limpia todo.
+                La siguiente consulta vuelve a cargarlo desde disco.
+        """
+        if conjunto is not None and conjunto not in _CLAVES_CACHE:
+            raise ValueError(f"Conjunto de datos desconocido: {conjunto}")
+        
+        # Se reemplaza el dict completo (nunca se muta): quien ya tomó el
+        # caché anterior sigue leyendo de él sin ver un conjunto a medio
+        # liberar; la validación también se descarta
+        with self._lock:
+            if conjunto is None:
+                self._cache = {}
+                return
+            claves = set(_CLAVES_CACHE[conjunto]) | {'validacion'}
+            self._cache = {k: v for k, v in self._cache.items() if k not in claves}
     
     def obtener_estadisticas_precio(self, cultivo: str) -> Dict:
         """
         Calcula estadísticas de precio de un cultivo.
         
+        Las estadísticas de todos los cultivos se calculan una sola vez
+        y se guardan en caché.
+        
         Args:
             cultivo: Nombre del cultivo
             
         Returns:
-            Dict con estadísticas
+            Dict con estadísticas sin redondear (el formato se aplica al mostrarlas)
         """
-        df = self.cargar_precios_historicos()
-        
-        if df.empty:
+        cache = self._cache_cargado('precios')
+        if cache is None:
             return {}
         
-        cultivo_data = df[df['cultivo'] == cultivo]
+        tabla = cache.get('precios_stats')
+        if tabla is None:
+            with self._lock:
+                tabla = cache.get('precios_stats')
+                if tabla is None:
+                    tabla = _estadisticas_precios(cache['precios'])
+                    cache['precios_stats'] = tabla
         
-        if cultivo_data.empty:
-            return {}
-        
-        precios = cultivo_data['precio_promedio_soles_kg']
-        
-        return {
-            'precio_medio': round(precios.mean(), 2),
-            'precio_minimo': round(precios.min(), 2),
-            'precio_maximo': round(precios.max(), 2),
-            'desviacion_estandar': round(precios.std(), 2),
-            'volatilidad': round(precios.std() / precios.mean(), 4)
-        }
+        stats = tabla.get(cultivo)
+        return dict(stats) if stats is not None else {}
     
     def obtener_estadisticas_clima(self, region: str) -> Dict:
         """
         Calcula estadísticas climáticas de una región.
         
+        Las estadísticas de todas las regiones se calculan una sola vez
+        y se guardan en caché.
+        
         Args:
             region: Nombre de la región
             
         Returns:
-            Dict con estadísticas
+            Dict con estadísticas sin redondear (el formato se aplica al mostrarlas)
         """
-        df = self.cargar_clima_simulado()
-        
-        if df.empty:
+        cache = self._cache_cargado('clima')
+        if cache is None:
             return {}
         
-        region_data = df[df['region'] == region]
-        
-        if region_data.empty:
-            return {}
+        tabla = cache.get('clima_stats')
+        if tabla is None:
+            with self._lock:
+                tabla = cache.get('clima_stats')
+                if tabla is None:
+                    tabla = _estadisticas_clima(cache['clima'])
+                    cache['clima_stats'] = tabla
         
-        return {
-            'temperatura_promedio': round(region_data['temperatura_promedio'].mean(), 2),
-            'precipitacion_anual': round(region_data['precipitacion_mm'].sum(), 2),
-            'humedad_promedio': round(region_data['humedad_relativa'].mean(), 2),
-            'riesgo_sequia_promedio': round(region_data['riesgo_sequia'].mean(), 4),
-            'riesgo_heladas_promedio': round(region_data['riesgo_heladas'].mean(), 4),
-            'riesgo_inundacion_promedio': round(region_data['riesgo_inundacion'].mean(), 4)
-        }
-
+        stats = tabla.get(region)
+        return dict(stats) if stats is not None else {}
 
-# Instancia global del cargador
-_loader = None
 
+# Instancia global del cargador: la fábrica memorizada la crea una sola vez
+@lru_cache(maxsize=1)
 def get_loader() -> DataLoader:
     """
     Obtiene la instancia global del cargador de datos.
@@ -322,10 +662,7 @@ def get_loader() -> DataLoader:
     Returns:
         Instancia de DataLoader
     """
-    global _loader
-    if _loader is None:
-        _loader = DataLoader()
-    return _loader
+    return DataLoader()
 
 
 # Funciones de conveniencia